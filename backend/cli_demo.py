@@ -6,6 +6,7 @@ Test the full pipeline without VS Code extension
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add backend to path
@@ -39,9 +40,12 @@ def demo_intent_parsing():
         "run tests"
     ]
     
-    for cmd in commands:
+    # Parse all commands concurrently, then print results in order
+    with ThreadPoolExecutor(max_workers=len(commands)) as executor:
+        intents = list(executor.map(parse_intent, commands))
+
+    for cmd, intent in zip(commands, intents):
         print(f"\n💬 Command: '{cmd}'")
-        intent = parse_intent(cmd)
         print(f"   Intent: {intent['intent']}")
         print(f"   Confidence: {intent['confidence']}")
         if intent['entities'].get('file'):
@@ -64,11 +68,14 @@ def demo_symbol_search():
     print_section("3. Symbol Search")
     
     symbols = ["parse_intent", "FastAPI", "IntentType"]
-    
-    for symbol in symbols:
+
+    # Run the searches concurrently, then print results in order
+    with ThreadPoolExecutor(max_workers=len(symbols)) as executor:
+        all_results = list(executor.map(lambda s: find_symbols(s, "python"), symbols))
+
+    for symbol, results in zip(symbols, all_results):
         print(f"\n🔍 Searching for: '{symbol}'")
-        results = find_symbols(symbol, "python")
-        
+
         if results:
             print(f"   Found {len(results)} location(s):")
             for r in results[:3]:  # Show first 3
@@ -143,11 +150,14 @@ def demo_code_search():
     print_section("6. Code Search")
     
     queries = ["FastAPI", "def ", "import"]
-    
-    for query in queries:
+
+    # Run the searches concurrently, then print results in order
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        all_results = list(executor.map(lambda q: search_code(q, "python"), queries))
+
+    for query, results in zip(queries, all_results):
         print(f"\n🔍 Searching for: '{query}'")
-        results = search_code(query, "python")
-        
+
         if results:
             print(f"   Found {len(results)} match(es)")
             # Show first match
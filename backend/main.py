@@ -1,6 +1,18 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+
+# Serialize responses with orjson when available (falls back to stdlib json)
+try:
+    import orjson  # noqa: F401 - ORJSONResponse requires it at render time
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    from fastapi.responses import JSONResponse as DefaultResponse
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List, Dict, Any
 import uvicorn
 import os
@@ -9,72 +21,92 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
-from modules.speech_to_text import transcribe_audio, transcribe_audio_file
-from modules.ai_reasoning import parse_intent
+from modules.speech_to_text import transcribe_audio, transcribe_audio_bytes, transcribe_audio_file
+from modules.ai_reasoning import parse_intent, parse_intent_async
 from modules.code_parser import search_code, find_symbols
 from modules.debugger_interface import run_command, explain_trace
 from modules.code_index import get_index, rebuild_index
 from modules.intent_router import get_router, register_handlers
-from modules.intent_schema import Intent, validate_intent
+from modules.intent_schema import Intent, intent_from_parsed, validate_intent
 from modules.linter import find_errors
 from modules.fix_generator import generate_fix
 
-app = FastAPI(title="EchoDebug API", version="0.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize components on startup"""
+    register_handlers()
+    # Try to load existing index
+    index = get_index()
+    if not index.last_indexed:
+        # Build index in the shared worker pool without blocking startup
+        asyncio.create_task(run_in_threadpool(index.build_index))
+    yield
+
+app = FastAPI(
+    title="EchoDebug API",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=DefaultResponse,
+)
 
-# CORS middleware for frontend integration
+# CORS middleware for frontend integration. Wildcard origins cannot be
+# combined with credentials (browsers reject it and it disables the CORS
+# response cache), so credentials are only enabled for an explicit list
+# set via ECHODEBUG_CORS_ORIGINS (comma-separated).
+cors_origins = [o.strip() for o in os.getenv("ECHODEBUG_CORS_ORIGINS", "*").split(",") if o.strip()]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
+    allow_origins=cors_origins,
+    allow_credentials="*" not in cors_origins,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-# Initialize intent router on startup
-@app.on_event("startup")
-async def startup_event():
-    """Initialize components on startup"""
-    register_handlers()
-    # Try to load existing index
-    index = get_index()
-    if not index.last_indexed:
-        # Build index in background if it doesn't exist
-        import threading
-        threading.Thread(target=lambda: index.build_index()).start()
+# Compress the larger JSON payloads (search results, symbol listings)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # Request/Response Models
-class STTRequest(BaseModel):
+class APIRequest(BaseModel):
+    """Base class for request payloads: immutable, unknown fields dropped
+    during validation instead of being carried through the pipeline"""
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
+class STTRequest(APIRequest):
     audio_data: str  # base64 encoded audio
     format: str = "wav"
 
-class IntentRequest(BaseModel):
+class IntentRequest(APIRequest):
     text: str
     context: Optional[Dict[str, Any]] = None
 
-class SearchRequest(BaseModel):
+class IntentBatchRequest(APIRequest):
+    texts: List[str]
+    context: Optional[Dict[str, Any]] = None
+
+class SearchRequest(APIRequest):
     query: str
     lang: str = "python"
     scope: str = "all"
 
-class SymbolRequest(BaseModel):
+class SymbolRequest(APIRequest):
     name: str
     lang: str = "python"
 
-class RunRequest(BaseModel):
+class RunRequest(APIRequest):
     cmd: str
     env: Optional[Dict[str, str]] = None
     timeout: int = 20
 
-class ExplainTraceRequest(BaseModel):
+class ExplainTraceRequest(APIRequest):
     trace: str
     snippets: Optional[List[str]] = None
 
-class ProposeFixRequest(BaseModel):
+class ProposeFixRequest(APIRequest):
     file: str
     span: Optional[Dict[str, int]] = None
     goal: str
 
-class ApplyFixRequest(BaseModel):
+class ApplyFixRequest(APIRequest):
     diff: str
 
 # Endpoints
@@ -95,11 +127,22 @@ async def speech_to_text(request: STTRequest):
 async def classify_intent(request: IntentRequest):
     """Parse natural language into structured intent"""
     try:
-        intent_data = parse_intent(request.text, request.context)
+        intent_data = await parse_intent_async(request.text, request.context)
         return intent_data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/intent/batch")
+async def classify_intent_batch(request: IntentBatchRequest):
+    """Parse several commands in one request, classifying them concurrently"""
+    try:
+        intents = await asyncio.gather(
+            *(parse_intent_async(text, request.context) for text in request.texts)
+        )
+        return {"intents": list(intents)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/search")
 async def search_codebase(request: SearchRequest):
     """Search code based on query"""
@@ -177,9 +220,9 @@ async def apply_code_fix(request: ApplyFixRequest):
 async def route_intent(request: IntentRequest):
     """Parse intent and route to appropriate handler"""
     try:
-        # Parse intent
-        intent_data = parse_intent(request.text, request.context)
-        intent = validate_intent(intent_data)
+        # Parse intent (already validated by the parser - no second pass)
+        intent_data = await parse_intent_async(request.text, request.context)
+        intent = intent_from_parsed(intent_data)
         
         # Route to handler
         router = get_router()
@@ -241,7 +284,7 @@ async def lint_file(file: str, lang: str = "python"):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-class STTFileRequest(BaseModel):
+class STTFileRequest(APIRequest):
     file_path: str
 
 @app.post("/stt/file")
@@ -253,5 +296,27 @@ async def speech_to_text_file(request: STTFileRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/stt/upload")
+async def speech_to_text_upload(audio: UploadFile = File(...)):
+    """Transcribe uploaded audio (multipart - no base64 inflation)"""
+    try:
+        audio_bytes = await audio.read()
+        text = await run_in_threadpool(
+            transcribe_audio_bytes, audio_bytes, audio.filename or "audio.wav"
+        )
+        return {"text": text}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    from importlib.util import find_spec
+
+    uvicorn.run(
+        "main:app",  # import string so workers > 1 can spawn
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        loop="uvloop" if find_spec("uvloop") else "auto",
+        http="httptools" if find_spec("httptools") else "auto",
+        timeout_keep_alive=75,
+    )
@@ -1,22 +1,70 @@
 import os
+import threading
+from functools import lru_cache
 from typing import Dict, Any, Optional
 import json
 from .intent_schema import Intent, IntentType, IntentEntities, get_intent_prompt, validate_intent
-from .intent_patterns import (
-    detect_intent_from_patterns,
-    extract_symbol_from_text,
-    extract_file_from_text,
-    extract_scope_from_text,
-    extract_line_number,
-    extract_function_name,
-    detect_language_from_text
-)
+from .intent_patterns import detect_intent_from_patterns, extract_entities
 
 # OpenAI client
 try:
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
 except ImportError:
     OpenAI = None
+    AsyncOpenAI = None
+
+# Faster JSON parsing when orjson is available
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# Static system prompt - computed once, reused for every request
+_SYSTEM_PROMPT = get_intent_prompt()
+
+# Small in-process cache for context-free commands ("run tests", "show me
+# errors", ...) so repeated utterances skip both the LLM and the fallback.
+# Insertion order doubles as an eviction order (oldest entry dropped first).
+_intent_cache: Dict[str, Dict[str, Any]] = {}
+_INTENT_CACHE_MAX = 256
+
+# Pattern matches at or above this confidence skip the LLM round trip;
+# priority-3 patterns score 0.85, so only the strongest matches qualify
+_PATTERN_CONFIDENCE_GATE = 0.85
+
+def _cache_get(text: str) -> Optional[Dict[str, Any]]:
+    cached = _intent_cache.get(text)
+    # Shallow copy so callers can't mutate the cached entry
+    return dict(cached) if cached is not None else None
+
+def _cache_put(text: str, result: Dict[str, Any]) -> None:
+    if len(_intent_cache) >= _INTENT_CACHE_MAX:
+        _intent_cache.pop(next(iter(_intent_cache)))
+    _intent_cache[text] = dict(result)
+
+# Lazily-initialized singleton client so repeated /intent requests reuse
+# the same HTTP connection pool instead of re-doing client setup per call
+_client = None
+_async_client = None
+_client_lock = threading.Lock()
+
+def _get_openai_client():
+    """Get or create the shared OpenAI client"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _client
+
+def _get_async_openai_client():
+    """Get or create the shared async OpenAI client"""
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _async_client
 
 def parse_intent(text: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
@@ -29,54 +77,120 @@ def parse_intent(text: str, context: Optional[Dict[str, Any]] = None) -> Dict[st
     Returns:
         Intent JSON with intent, confidence, entities
     """
+    if context is None:
+        cached = _cache_get(text)
+        if cached is not None:
+            return cached
+
     # Check if OpenAI API key is available
     api_key = os.getenv("OPENAI_API_KEY")
-    
-    if api_key and api_key != "your_api_key_here":
-        # Use OpenAI GPT for intent parsing
-        try:
-            return _parse_intent_with_llm(text, context)
-        except Exception as e:
-            print(f"LLM parsing failed, falling back to keyword matching: {e}")
-            return _parse_intent_fallback(text)
+
+    if OpenAI is not None and api_key and api_key != "your_api_key_here":
+        # Confidence gate: a strong pattern match doesn't need the LLM
+        result = _parse_intent_fallback(text)
+        if result["confidence"] < _PATTERN_CONFIDENCE_GATE:
+            # Use OpenAI GPT for intent parsing
+            try:
+                result = _parse_intent_with_llm(text, context)
+            except Exception as e:
+                print(f"LLM parsing failed, falling back to keyword matching: {e}")
     else:
         # Fallback to keyword matching
-        return _parse_intent_fallback(text)
+        result = _parse_intent_fallback(text)
 
-def _parse_intent_with_llm(text: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    """Parse intent using OpenAI GPT"""
-    from openai import OpenAI
-    
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    
-    # Build context string
+    if context is None:
+        _cache_put(text, result)
+
+    return result
+
+def _build_user_prompt(text: str, context: Optional[Dict[str, Any]] = None) -> str:
+    """Build the user prompt including optional workspace context"""
     context_str = ""
     if context:
         if "files" in context:
             context_str += f"\nAvailable files: {', '.join(context['files'][:10])}"
         if "current_file" in context:
             context_str += f"\nCurrent file: {context['current_file']}"
-    
-    system_prompt = get_intent_prompt()
-    user_prompt = f"User command: {text}{context_str}"
-    
+
+    return f"User command: {text}{context_str}"
+
+def _parse_llm_response(content: str) -> Dict[str, Any]:
+    """Parse and validate the LLM JSON response"""
+    intent_data = _json_loads(content)
+    validated = validate_intent(intent_data)
+    return validated.dict()
+
+def _parse_intent_with_llm(text: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Parse intent using OpenAI GPT"""
+    client = _get_openai_client()
+    user_prompt = _build_user_prompt(text, context)
+
     try:
         response = client.chat.completions.create(
             model="gpt-4o-mini",  # Using mini for speed and cost
             messages=[
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": _SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt}
             ],
             temperature=0.3,
             response_format={"type": "json_object"}
         )
-        
-        intent_data = json.loads(response.choices[0].message.content)
-        
-        # Validate and return
-        validated = validate_intent(intent_data)
-        return validated.dict()
-    
+
+        return _parse_llm_response(response.choices[0].message.content)
+
+    except Exception as e:
+        print(f"LLM parsing error: {e}")
+        # Fall back to keyword matching
+        return _parse_intent_fallback(text)
+
+async def parse_intent_async(text: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Async variant of parse_intent for use inside the API event loop.
+
+    Uses AsyncOpenAI so the LLM round trip does not block other requests.
+    """
+    if context is None:
+        cached = _cache_get(text)
+        if cached is not None:
+            return cached
+
+    api_key = os.getenv("OPENAI_API_KEY")
+
+    if AsyncOpenAI is not None and api_key and api_key != "your_api_key_here":
+        # Confidence gate: a strong pattern match doesn't need the LLM
+        result = _parse_intent_fallback(text)
+        if result["confidence"] < _PATTERN_CONFIDENCE_GATE:
+            try:
+                result = await _parse_intent_with_llm_async(text, context)
+            except Exception as e:
+                print(f"LLM parsing failed, falling back to keyword matching: {e}")
+    else:
+        # Fallback to keyword matching
+        result = _parse_intent_fallback(text)
+
+    if context is None:
+        _cache_put(text, result)
+
+    return result
+
+async def _parse_intent_with_llm_async(text: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Parse intent using OpenAI GPT without blocking the event loop"""
+    client = _get_async_openai_client()
+    user_prompt = _build_user_prompt(text, context)
+
+    try:
+        response = await client.chat.completions.create(
+            model="gpt-4o-mini",  # Using mini for speed and cost
+            messages=[
+                {"role": "system", "content": _SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=0.3,
+            response_format={"type": "json_object"}
+        )
+
+        return _parse_llm_response(response.choices[0].message.content)
+
     except Exception as e:
         print(f"LLM parsing error: {e}")
         # Fall back to keyword matching
@@ -84,59 +198,36 @@ def _parse_intent_with_llm(text: str, context: Optional[Dict[str, Any]] = None)
 
 def _parse_intent_fallback(text: str) -> Dict[str, Any]:
     """Enhanced pattern-based intent parsing"""
-    
+
     # Use pattern matching for intent detection
     intent, confidence = detect_intent_from_patterns(text)
-    
-    # Extract entities using specialized extractors
-    entities = IntentEntities(
-        file=extract_file_from_text(text),
-        symbol=extract_symbol_from_text(text),
-        language=detect_language_from_text(text),
-        scope=extract_scope_from_text(text),
-        line=extract_line_number(text),
-        function=extract_function_name(text)
+
+    # Extract entities in one pass over the utterance. Everything here is
+    # produced by our own typed code, so skip pydantic validation and
+    # assemble the models directly (enum values unwrapped to match the
+    # use_enum_values output of the validated path).
+    extracted = extract_entities(text)
+    entities = IntentEntities.model_construct(
+        file=extracted["file"],
+        symbol=extracted["symbol"],
+        language=extracted["language"],
+        scope=extracted["scope"].value,
+        line=extracted["line"],
+        function=extracted["function"],
+        error_type=None,
     )
-    
-    # Create validated intent
-    intent_obj = Intent(
-        intent=intent,
+
+    intent_obj = Intent.model_construct(
+        intent=intent.value,
         confidence=confidence,
         entities=entities,
         follow_up_allowed=True,
-        raw_text=text
+        raw_text=text,
     )
-    
-    return intent_obj.dict()
 
-def _extract_file_entity(text: str) -> Dict[str, Any]:
-    """Extract file name from text"""
-    # Simple extraction - improve with NER
-    words = text.split()
-    for word in words:
-        if ".py" in word or ".js" in word or ".java" in word:
-            return {"file": word.strip("\"'"), "language": _detect_language(word)}
-    return {"file": None, "language": "python"}
-
-def _extract_symbol_entity(text: str) -> Dict[str, Any]:
-    """Extract symbol name from text"""
-    # Look for quoted strings or camelCase/snake_case identifiers
-    words = text.split()
-    for i, word in enumerate(words):
-        if word in ["where", "find", "symbol"]:
-            if i + 1 < len(words):
-                symbol = words[i + 1].strip("\"'")
-                return {
-                    "symbol": symbol,
-                    "scope": "all",
-                    "language": "python"
-                }
-    return {"symbol": None, "scope": "all", "language": "python"}
-
-def _extract_code_entity(text: str) -> Dict[str, Any]:
-    """Extract code reference from text"""
-    return {"target": "selection", "language": "python"}
+    return intent_obj.dict()
 
+@lru_cache(maxsize=128)
 def _detect_language(filename: str) -> str:
     """Detect programming language from filename"""
     if filename.endswith(".py"):
@@ -146,20 +237,3 @@ def _detect_language(filename: str) -> str:
     elif filename.endswith(".java"):
         return "java"
     return "unknown"
-
-def generate_llm_response(prompt: str, system_prompt: Optional[str] = None) -> str:
-    """
-    Generate response using LLM.
-    
-    Args:
-        prompt: User prompt
-        system_prompt: Optional system instructions
-    
-    Returns:
-        LLM response text
-    """
-    # TODO: Implement OpenAI API call
-    # client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    # response = client.chat.completions.create(...)
-    
-    return "LLM response placeholder"
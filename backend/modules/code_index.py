@@ -4,10 +4,34 @@ Builds and maintains an index of code symbols for quick searches
 """
 
 import os
+import sys
 import ast
 import json
+import pickle
+import zlib
 import hashlib
+import mmap
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
+
+# blake3 hashes several times faster than md5 and mmaps avoid the full
+# read copy; fall back to the fastest stdlib hash when not installed
+try:
+    from blake3 import blake3 as _blake3
+except ImportError:
+    _blake3 = None
+
+# zstandard compresses/decompresses far faster than zlib at similar
+# ratios; fall back to stdlib zlib when not installed
+try:
+    import zstandard as _zstd
+except ImportError:
+    _zstd = None
+
+# Magic bytes of the zstd frame format, used to pick the decompressor
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
 from typing import Dict, List, Any, Optional, Set
 from dataclasses import dataclass, asdict
 from datetime import datetime
@@ -15,7 +39,55 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Bumped whenever the on-disk layout or change-detection key changes,
+# so stale index files reindex instead of misbehaving
+INDEX_SCHEMA_VERSION = 2
+
+# Directory names pruned during traversal (never descended into)
+IGNORED_DIRS = frozenset([
+    ".git", "__pycache__", "node_modules", ".venv", "venv",
+    "dist", "build", ".pytest_cache", ".mypy_cache",
+])
+
+def should_ignore(path) -> bool:
+    """
+    True when path sits under an ignored directory or is an index file.
+
+    Checks each path component against the IGNORED_DIRS set - one hash
+    lookup per component instead of a substring scan per pattern.
+    """
+    p = Path(path)
+    return (
+        any(part in IGNORED_DIRS for part in p.parts)
+        or p.name.startswith(".echodebug_index")
+    )
+
+def iter_source_files(root, suffix: str = ".py"):
+    """
+    Yield (Path, stat_result) for every source file under root.
+
+    Uses os.scandir so entries come back with cached stat data (one
+    batched directory read instead of a stat syscall per entry, unlike
+    Path.glob) and ignored directories are pruned without descending.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in IGNORED_DIRS:
+                                stack.append(entry.path)
+                        elif entry.name.endswith(suffix):
+                            yield Path(entry.path), entry.stat()
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+@dataclass(slots=True)
 class Symbol:
     """Represents a code symbol"""
     name: str
@@ -32,7 +104,7 @@ class Symbol:
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
 
-@dataclass
+@dataclass(slots=True)
 class Reference:
     """Represents a symbol reference (read/write)"""
     symbol: str
@@ -42,16 +114,149 @@ class Reference:
     ref_type: str  # read, write, call
     context: Optional[str] = None
 
+def _get_name(node) -> str:
+    """Extract name from AST node"""
+    if isinstance(node, ast.Name):
+        return node.id
+    elif isinstance(node, ast.Attribute):
+        return f"{_get_name(node.value)}.{node.attr}"
+    return str(node)
+
+class _SymbolCollector(ast.NodeVisitor):
+    """
+    Single-pass AST visitor collecting Symbol entries.
+
+    Only statement bodies are traversed - expression subtrees, which make
+    up the bulk of the node count, cannot contain indexable symbols, so
+    this visits far fewer nodes than ast.walk over the full tree.
+    """
+
+    # Statement-list fields worth descending into
+    _BLOCK_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+
+    def __init__(self, rel_path: str):
+        self.rel_path = rel_path
+        self.symbols: List[Symbol] = []
+        # O(1) duplicate suppression, replacing the old O(n^2)
+        # `symbol not in symbols` list scan per appended symbol
+        self._seen = set()
+
+    def _add(self, symbol: Symbol) -> None:
+        # Intern the name so a symbol repeated across many files ("main",
+        # "setUp", common imports) is one string object index-wide
+        symbol.name = sys.intern(symbol.name)
+        key = (symbol.name, symbol.kind, symbol.line, symbol.column)
+        if key not in self._seen:
+            self._seen.add(key)
+            self.symbols.append(symbol)
+
+    def generic_visit(self, node):
+        for field in self._BLOCK_FIELDS:
+            for child in getattr(node, field, ()):
+                self.visit(child)
+
+    def visit_FunctionDef(self, node):
+        self._add_function(node, "def")
+
+    def visit_AsyncFunctionDef(self, node):
+        self._add_function(node, "async def")
+
+    def _add_function(self, node, prefix: str):
+        args = [arg.arg for arg in node.args.args]
+        self._add(Symbol(
+            name=node.name,
+            kind="function",
+            file=self.rel_path,
+            line=node.lineno,
+            column=node.col_offset,
+            end_line=node.end_lineno,
+            signature=f"{prefix} {node.name}({', '.join(args)})",
+            docstring=ast.get_docstring(node),
+            language="python"
+        ))
+        self.generic_visit(node)
+
+    def visit_ClassDef(self, node):
+        bases = [_get_name(base) for base in node.bases]
+        signature = f"class {node.name}({', '.join(bases)})" if bases else f"class {node.name}"
+
+        self._add(Symbol(
+            name=node.name,
+            kind="class",
+            file=self.rel_path,
+            line=node.lineno,
+            column=node.col_offset,
+            end_line=node.end_lineno,
+            signature=signature,
+            docstring=ast.get_docstring(node),
+            language="python"
+        ))
+        self.generic_visit(node)
+
+    def visit_Assign(self, node):
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                self._add(Symbol(
+                    name=target.id,
+                    kind="variable",
+                    file=self.rel_path,
+                    line=node.lineno,
+                    column=node.col_offset,
+                    language="python"
+                ))
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self._add(Symbol(
+                name=alias.asname or alias.name,
+                kind="import",
+                file=self.rel_path,
+                line=node.lineno,
+                column=node.col_offset,
+                signature=f"import {alias.name}",
+                language="python"
+            ))
+
+    def visit_ImportFrom(self, node):
+        for alias in node.names:
+            self._add(Symbol(
+                name=alias.asname or alias.name,
+                kind="import",
+                file=self.rel_path,
+                line=node.lineno,
+                column=node.col_offset,
+                signature=f"from {node.module} import {alias.name}",
+                language="python"
+            ))
+
+@lru_cache(maxsize=4096)
+def _parse_source(path: str, mtime_ns: int):
+    """
+    Parse a source file, caching the AST by (path, mtime_ns).
+
+    Repeated build_index calls (force rebuilds, watch-style usage) mostly
+    see unchanged files; keying on mtime_ns means edits invalidate their
+    entry automatically while steady-state re-indexes skip the parse.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return ast.parse(f.read())
+
 class CodeIndex:
     """Maintains an index of code symbols for fast lookup"""
     
     def __init__(self, workspace_path: str = "."):
         self.workspace = Path(workspace_path)
         self.symbols: Dict[str, List[Symbol]] = {}  # symbol_name -> [Symbol]
-        self.files: Dict[str, str] = {}  # file_path -> file_hash
+        self.by_file: Dict[str, List[Symbol]] = defaultdict(list)  # file_path -> [Symbol]
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)  # trigram -> {symbol_name}
+        self.files: Dict[str, str] = {}  # file_path -> "mtime_ns:size" signature
         self.references: Dict[str, List[Reference]] = {}  # symbol_name -> [Reference]
         self.last_indexed = None
-        self.index_file = self.workspace / ".echodebug_index.json"
+        # Binary index by default; set ECHODEBUG_INDEX_JSON=1 to keep the
+        # (slower, larger) JSON format for manual inspection
+        self._json_index = os.getenv("ECHODEBUG_INDEX_JSON") == "1"
+        suffix = ".json" if self._json_index else ".bin"
+        self.index_file = self.workspace / f".echodebug_index{suffix}"
     
     def build_index(self, force: bool = False) -> Dict[str, Any]:
         """
@@ -73,39 +278,43 @@ class CodeIndex:
             "errors": 0
         }
         
-        # Find all code files
-        python_files = list(self.workspace.glob("**/*.py"))
-        
-        for file_path in python_files:
-            if self._should_ignore(file_path):
-                stats["files_skipped"] += 1
-                continue
-            
-            try:
-                # Check if file changed
-                file_hash = self._hash_file(file_path)
-                rel_path = str(file_path.relative_to(self.workspace))
-                
-                if not force and rel_path in self.files and self.files[rel_path] == file_hash:
+        # Find all code files (ignored directories pruned during the walk)
+        candidates = list(iter_source_files(self.workspace, ".py"))
+
+        # Stat and parse files in parallel - the per-file work is I/O plus
+        # C-level ast.parse, so threads overlap well. Results are
+        # merged on this thread to keep the index dicts single-writer.
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            future_map = {
+                pool.submit(self._scan_file, path, force, st): path
+                for path, st in candidates
+            }
+
+            for future in as_completed(future_map):
+                try:
+                    rel_path, file_hash, symbols = future.result()
+                except Exception as e:
+                    logger.error(f"Error indexing {future_map[future]}: {e}")
+                    stats["errors"] += 1
+                    continue
+
+                if symbols is None:
+                    # Unchanged since last index
                     stats["files_skipped"] += 1
                     continue
-                
-                # Index the file
-                symbols = self._index_python_file(file_path)
-                
+
                 # Store symbols
                 for symbol in symbols:
                     if symbol.name not in self.symbols:
                         self.symbols[symbol.name] = []
+                        self._add_trigrams(symbol.name)
                     self.symbols[symbol.name].append(symbol)
+                    self.by_file[symbol.file].append(symbol)
                     stats["symbols_found"] += 1
-                
+
                 self.files[rel_path] = file_hash
                 stats["files_indexed"] += 1
-                
-            except Exception as e:
-                logger.error(f"Error indexing {file_path}: {e}")
-                stats["errors"] += 1
         
         self.last_indexed = datetime.now()
         duration = (self.last_indexed - start_time).total_seconds()
@@ -118,105 +327,40 @@ class CodeIndex:
         
         return stats
     
-    def _index_python_file(self, file_path: Path) -> List[Symbol]:
-        """Index a Python file using AST"""
-        symbols = []
-        
+    def _scan_file(self, file_path: Path, force: bool = False, st=None):
+        """
+        Stat one file and reparse it if it changed.
+
+        Change detection uses an (mtime_ns, size) signature - one stat call
+        instead of reading and hashing the whole file, the same staleness
+        key ninja and mypy rely on. Content hashing (_hash_file) remains
+        available for callers that need to disambiguate. Pass a stat result
+        from the directory walk to avoid restating the file.
+
+        Returns:
+            (rel_path, file_sig, symbols) - symbols is None when unchanged
+        """
+        if st is None:
+            st = file_path.stat()
+        file_sig = f"{st.st_mtime_ns}:{st.st_size}"
+        rel_path = str(file_path.relative_to(self.workspace))
+
+        if not force and self.files.get(rel_path) == file_sig:
+            return rel_path, file_sig, None
+
+        return rel_path, file_sig, self._index_python_file(file_path, st.st_mtime_ns)
+
+    def _index_python_file(self, file_path: Path, mtime_ns: int) -> List[Symbol]:
+        """Index a Python file using a single-pass AST visitor"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                source = f.read()
-            
-            tree = ast.parse(source)
-            rel_path = str(file_path.relative_to(self.workspace))
-            
-            # Walk AST and extract symbols
-            for node in ast.walk(tree):
-                symbol = None
-                
-                # Function definitions
-                if isinstance(node, ast.FunctionDef):
-                    args = [arg.arg for arg in node.args.args]
-                    signature = f"def {node.name}({', '.join(args)})"
-                    docstring = ast.get_docstring(node)
-                    
-                    symbol = Symbol(
-                        name=node.name,
-                        kind="function",
-                        file=rel_path,
-                        line=node.lineno,
-                        column=node.col_offset,
-                        end_line=node.end_lineno,
-                        signature=signature,
-                        docstring=docstring,
-                        language="python"
-                    )
-                
-                # Class definitions
-                elif isinstance(node, ast.ClassDef):
-                    bases = [self._get_name(base) for base in node.bases]
-                    signature = f"class {node.name}({', '.join(bases)})" if bases else f"class {node.name}"
-                    docstring = ast.get_docstring(node)
-                    
-                    symbol = Symbol(
-                        name=node.name,
-                        kind="class",
-                        file=rel_path,
-                        line=node.lineno,
-                        column=node.col_offset,
-                        end_line=node.end_lineno,
-                        signature=signature,
-                        docstring=docstring,
-                        language="python"
-                    )
-                
-                # Variable assignments (module level)
-                elif isinstance(node, ast.Assign):
-                    for target in node.targets:
-                        if isinstance(target, ast.Name):
-                            symbol = Symbol(
-                                name=target.id,
-                                kind="variable",
-                                file=rel_path,
-                                line=node.lineno,
-                                column=node.col_offset,
-                                language="python"
-                            )
-                            symbols.append(symbol)
-                
-                # Imports
-                elif isinstance(node, ast.Import):
-                    for alias in node.names:
-                        symbol = Symbol(
-                            name=alias.asname or alias.name,
-                            kind="import",
-                            file=rel_path,
-                            line=node.lineno,
-                            column=node.col_offset,
-                            signature=f"import {alias.name}",
-                            language="python"
-                        )
-                        symbols.append(symbol)
-                
-                elif isinstance(node, ast.ImportFrom):
-                    for alias in node.names:
-                        symbol = Symbol(
-                            name=alias.asname or alias.name,
-                            kind="import",
-                            file=rel_path,
-                            line=node.lineno,
-                            column=node.col_offset,
-                            signature=f"from {node.module} import {alias.name}",
-                            language="python"
-                        )
-                        symbols.append(symbol)
-                
-                if symbol and symbol not in symbols:
-                    symbols.append(symbol)
-        
+            tree = _parse_source(str(file_path), mtime_ns)
+            collector = _SymbolCollector(str(file_path.relative_to(self.workspace)))
+            collector.visit(tree)
+            return collector.symbols
+
         except Exception as e:
             logger.error(f"Error parsing {file_path}: {e}")
-        
-        return symbols
+            return []
     
     def search_symbols(self, query: str, kind: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
         """
@@ -232,17 +376,42 @@ class CodeIndex:
         """
         results = []
         query_lower = query.lower()
-        
-        for name, symbol_list in self.symbols.items():
-            if query_lower in name.lower():
-                for symbol in symbol_list:
-                    if kind and symbol.kind != kind:
-                        continue
-                    results.append(symbol.to_dict())
-                    if len(results) >= limit:
-                        return results
-        
+
+        if len(query_lower) >= 3:
+            # Trigram prefilter: intersect the posting sets for each query
+            # trigram, then substring-verify only the surviving candidates
+            # instead of every distinct name in the index
+            postings = [
+                self._trigrams.get(query_lower[i:i + 3])
+                for i in range(len(query_lower) - 2)
+            ]
+            if any(p is None for p in postings):
+                return results
+            candidates = sorted(set.intersection(*postings))
+        else:
+            # Queries shorter than a trigram fall back to the linear scan
+            candidates = [
+                name for name in self.symbols
+                if query_lower in name.lower()
+            ]
+
+        for name in candidates:
+            if query_lower not in name.lower():
+                continue
+            for symbol in self.symbols[name]:
+                if kind and symbol.kind != kind:
+                    continue
+                results.append(symbol.to_dict())
+                if len(results) >= limit:
+                    return results
+
         return results
+
+    def _add_trigrams(self, name: str):
+        """Insert a symbol name into the trigram inverted index"""
+        lowered = name.lower()
+        for i in range(len(lowered) - 2):
+            self._trigrams[lowered[i:i + 3]].add(name)
     
     def get_symbol_references(self, symbol_name: str) -> List[Dict[str, Any]]:
         """Get all references to a symbol"""
@@ -250,77 +419,127 @@ class CodeIndex:
         return [asdict(ref) for ref in refs]
     
     def get_file_symbols(self, file_path: str) -> List[Dict[str, Any]]:
-        """Get all symbols defined in a file"""
-        results = []
-        for symbol_list in self.symbols.values():
+        """Get all symbols defined in a file (one reverse-index lookup)"""
+        return [symbol.to_dict() for symbol in self.by_file.get(file_path, ())]
+
+    def _rebuild_by_file(self):
+        """Repopulate the derived in-memory indexes after a load"""
+        self.by_file = defaultdict(list)
+        self._trigrams = defaultdict(set)
+        for name, symbol_list in self.symbols.items():
+            self._add_trigrams(name)
             for symbol in symbol_list:
-                if symbol.file == file_path:
-                    results.append(symbol.to_dict())
-        return results
-    
-    def _should_ignore(self, path: Path) -> bool:
-        """Check if path should be ignored"""
-        ignore_patterns = [
-            ".git", "__pycache__", "node_modules", ".venv", "venv",
-            "dist", "build", ".pytest_cache", ".mypy_cache", ".echodebug_index.json"
-        ]
-        return any(pattern in str(path) for pattern in ignore_patterns)
+                self.by_file[symbol.file].append(symbol)
     
     def _hash_file(self, file_path: Path) -> str:
         """Calculate file hash for change detection"""
         with open(file_path, 'rb') as f:
-            return hashlib.md5(f.read()).hexdigest()
-    
-    def _get_name(self, node) -> str:
-        """Extract name from AST node"""
-        if isinstance(node, ast.Name):
-            return node.id
-        elif isinstance(node, ast.Attribute):
-            return f"{self._get_name(node.value)}.{node.attr}"
-        return str(node)
+            if _blake3 is not None:
+                try:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        return _blake3(mm).hexdigest()
+                except ValueError:
+                    # Empty files cannot be mmapped
+                    return _blake3(f.read()).hexdigest()
+            if hasattr(hashlib, "file_digest"):
+                # 3.11+: streams straight into the C hash core (no bytes
+                # copy) and uses the SHA-NI instructions where present
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            digest = hashlib.sha256()
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+            return digest.hexdigest()
     
     def _save_index(self):
-        """Save index to disk"""
+        """Save index to disk (compressed pickle, or JSON when flagged)"""
         try:
-            data = {
-                "last_indexed": self.last_indexed.isoformat() if self.last_indexed else None,
-                "files": self.files,
-                "symbols": {
-                    name: [s.to_dict() for s in symbols]
-                    for name, symbols in self.symbols.items()
+            if self._json_index:
+                data = {
+                    "version": INDEX_SCHEMA_VERSION,
+                    "last_indexed": self.last_indexed.isoformat() if self.last_indexed else None,
+                    "files": self.files,
+                    "symbols": {
+                        name: [s.to_dict() for s in symbols]
+                        for name, symbols in self.symbols.items()
+                    }
                 }
-            }
-            
-            with open(self.index_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            
+                with open(self.index_file, 'w') as f:
+                    json.dump(data, f, indent=2)
+            else:
+                # pickle rebuilds the Symbol dataclasses natively on load,
+                # skipping the Symbol(**dict) reconstruction loop entirely
+                payload = pickle.dumps(
+                    (INDEX_SCHEMA_VERSION, self.last_indexed, self.files, self.symbols),
+                    protocol=pickle.HIGHEST_PROTOCOL
+                )
+                if _zstd is not None:
+                    payload = _zstd.ZstdCompressor(level=3).compress(payload)
+                else:
+                    payload = zlib.compress(payload, 6)
+                with open(self.index_file, 'wb') as f:
+                    f.write(payload)
+
             logger.info(f"Index saved to {self.index_file}")
         except Exception as e:
             logger.error(f"Error saving index: {e}")
-    
+
     def load_index(self) -> bool:
         """Load index from disk"""
         try:
             if not self.index_file.exists():
                 return False
-            
-            with open(self.index_file, 'r') as f:
-                data = json.load(f)
-            
-            self.files = data.get("files", {})
-            self.last_indexed = datetime.fromisoformat(data["last_indexed"]) if data.get("last_indexed") else None
-            
-            # Reconstruct symbols
-            self.symbols = {}
-            for name, symbol_dicts in data.get("symbols", {}).items():
-                self.symbols[name] = [Symbol(**s) for s in symbol_dicts]
-            
+
+            if self._json_index:
+                return self._load_json_index()
+
+            with open(self.index_file, 'rb') as f:
+                payload = f.read()
+
+            if payload.startswith(_ZSTD_MAGIC):
+                if _zstd is None:
+                    logger.info("Index is zstd-compressed but zstandard is not installed")
+                    return False
+                payload = _zstd.ZstdDecompressor().decompress(payload)
+            else:
+                payload = zlib.decompress(payload)
+
+            version, last_indexed, files, symbols = pickle.loads(payload)
+            if version != INDEX_SCHEMA_VERSION:
+                logger.info("Index schema changed, discarding stale index")
+                return False
+
+            self.last_indexed = last_indexed
+            self.files = files
+            self.symbols = symbols
+            self._rebuild_by_file()
+
             logger.info(f"Index loaded from {self.index_file}")
             return True
         except Exception as e:
             logger.error(f"Error loading index: {e}")
             return False
 
+    def _load_json_index(self) -> bool:
+        """Load the JSON-format index (ECHODEBUG_INDEX_JSON=1)"""
+        with open(self.index_file, 'r') as f:
+            data = json.load(f)
+
+        if data.get("version") != INDEX_SCHEMA_VERSION:
+            logger.info("Index schema changed, discarding stale index")
+            return False
+
+        self.files = data.get("files", {})
+        self.last_indexed = datetime.fromisoformat(data["last_indexed"]) if data.get("last_indexed") else None
+
+        # Reconstruct symbols
+        self.symbols = {}
+        for name, symbol_dicts in data.get("symbols", {}).items():
+            self.symbols[name] = [Symbol(**s) for s in symbol_dicts]
+        self._rebuild_by_file()
+
+        logger.info(f"Index loaded from {self.index_file}")
+        return True
+
 # Global index instance
 _index: Optional[CodeIndex] = None
 
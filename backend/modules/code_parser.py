@@ -1,9 +1,30 @@
 import os
 import ast
 import re
-from typing import List, Dict, Any
+import json
+import mmap
+import shutil
+import subprocess
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
 from pathlib import Path
 
+from .code_index import iter_source_files, should_ignore  # noqa: F401 - shared ignore helper
+
+def _pool_size() -> int:
+    """Worker count for the I/O-bound per-file scans"""
+    return min(32, (os.cpu_count() or 1) * 4)
+
+# ripgrep fast path: PATH lookup done once at import time
+_RG = shutil.which("rg")
+_RG_TYPES = {
+    "python": "py",
+    "javascript": "js",
+    "typescript": "ts",
+    "java": "java"
+}
+
 def search_code(query: str, lang: str = "python", scope: str = "all") -> List[Dict[str, Any]]:
     """
     Search codebase for query string.
@@ -17,45 +38,147 @@ def search_code(query: str, lang: str = "python", scope: str = "all") -> List[Di
         List of search results with file, line, preview
     """
     results = []
-    
+
     # Get workspace root (for now, use current directory)
     workspace = Path.cwd()
-    
-    # File patterns by language
-    patterns = {
-        "python": "**/*.py",
-        "javascript": "**/*.js",
-        "typescript": "**/*.ts",
-        "java": "**/*.java"
+
+    # File suffix by language
+    suffixes = {
+        "python": ".py",
+        "javascript": ".js",
+        "typescript": ".ts",
+        "java": ".java"
     }
-    
-    pattern = patterns.get(lang, "**/*.*")
-    
+
+    suffix = suffixes.get(lang, "")  # unknown language: scan every file
+
+    query_bytes = query.encode("utf-8").lower()
+    if not query_bytes:
+        return results
+
+    # ripgrep is dramatically faster than the Python scanner; use it when
+    # installed and fall back below if it errors out
+    if _RG is not None:
+        rg_results = _rg_search(query, lang, workspace)
+        if rg_results is not None:
+            return rg_results
+
     try:
-        for file_path in workspace.glob(pattern):
-            if _should_ignore(file_path):
-                continue
-            
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                    
-                for line_num, line in enumerate(lines, 1):
-                    if query.lower() in line.lower():
-                        results.append({
-                            "file": str(file_path.relative_to(workspace)),
-                            "line": line_num,
-                            "preview": line.strip(),
-                            "context": _get_context(lines, line_num)
-                        })
-            except Exception:
-                continue
-    
+        # Fan the per-file scans out over a thread pool - the work is
+        # I/O-bound, so threads overlap the open/read latency. Futures
+        # are drained in submission order to keep walk-order results.
+        paths = [path for path, _st in iter_source_files(workspace, suffix)]
+        with ThreadPoolExecutor(max_workers=_pool_size()) as pool:
+            futures = [
+                pool.submit(_search_file, path, workspace, query_bytes)
+                for path in paths
+            ]
+            for future in futures:
+                results.extend(future.result())
+                if len(results) >= 50:
+                    # Limit hit - drop any scans that haven't started
+                    for pending in futures:
+                        pending.cancel()
+                    break
+
     except Exception as e:
         raise Exception(f"Search error: {str(e)}")
-    
+
     return results[:50]  # Limit results
 
+def _rg_search(query: str, lang: str, workspace: Path) -> Optional[List[Dict[str, Any]]]:
+    """
+    Search with ripgrep, returning result dicts in the scanner's shape.
+
+    Returns None when rg fails for any reason so the caller can fall
+    back to the Python scanner.
+    """
+    cmd = [_RG, "--json", "-i", "-F", "-m", "50", "--", query]
+    rg_type = _RG_TYPES.get(lang)
+    if rg_type:
+        cmd[1:1] = ["--type", rg_type]
+
+    try:
+        proc = subprocess.run(
+            cmd, cwd=workspace, capture_output=True, text=True, timeout=30
+        )
+        # 0 = matches, 1 = no matches; anything else is an rg error
+        if proc.returncode not in (0, 1):
+            return None
+
+        results = []
+        offsets_cache: Dict[str, tuple] = {}
+        for line in proc.stdout.splitlines():
+            event = json.loads(line)
+            if event.get("type") != "match":
+                continue
+            match = event["data"]
+            rel_path = match["path"]["text"]
+            line_num = match["line_number"]
+
+            # Context comes from a cached per-file newline table so each
+            # matched file is read at most once
+            if rel_path not in offsets_cache:
+                raw = (workspace / rel_path).read_bytes()
+                offsets_cache[rel_path] = (raw, _newline_offsets(raw))
+            raw, newlines = offsets_cache[rel_path]
+
+            results.append({
+                "file": rel_path,
+                "line": line_num,
+                "preview": match["lines"]["text"].strip(),
+                "context": _get_context(raw, newlines, line_num - 1)
+            })
+            if len(results) >= 50:
+                break
+
+        return results
+    except Exception:
+        return None
+
+def _search_file(file_path: Path, workspace: Path, query_bytes: bytes) -> List[Dict[str, Any]]:
+    """Scan one file for query_bytes, returning result dicts"""
+    results = []
+    try:
+        # Memory-map the file instead of reading it: the raw bytes
+        # stay in the page cache and only the matched slices are
+        # ever copied out. The case-insensitive scan lowercases
+        # the buffer once with the C-level bytes.lower, instead of
+        # two str.lower() allocations per line.
+        with open(file_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = mm[:].lower()
+
+            pos = data.find(query_bytes)
+            if pos < 0:
+                return results
+
+            newlines = _newline_offsets(data)
+            while pos >= 0:
+                line_idx = bisect_left(newlines, pos)
+                start = newlines[line_idx - 1] + 1 if line_idx else 0
+                end = newlines[line_idx] if line_idx < len(newlines) else len(mm)
+                results.append({
+                    "file": str(file_path.relative_to(workspace)),
+                    "line": line_idx + 1,
+                    "preview": mm[start:end].decode("utf-8", "replace").strip(),
+                    "context": _get_context(mm, newlines, line_idx)
+                })
+                # One result per line, as before
+                pos = data.find(query_bytes, end + 1)
+    except Exception:
+        pass
+    return results
+
+def _newline_offsets(data: bytes) -> List[int]:
+    """Offsets of every newline in data, for offset -> line mapping"""
+    offsets = []
+    pos = data.find(b"\n")
+    while pos >= 0:
+        offsets.append(pos)
+        pos = data.find(b"\n", pos + 1)
+    return offsets
+
 def find_symbols(name: str, lang: str = "python", use_index: bool = True) -> List[Dict[str, Any]]:
     """
     Find symbol definitions and references.
@@ -90,62 +213,68 @@ def _find_python_symbols(name: str) -> List[Dict[str, Any]]:
     """Find Python symbols using AST"""
     results = []
     workspace = Path.cwd()
-    
-    for file_path in workspace.glob("**/*.py"):
-        if _should_ignore(file_path):
-            continue
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                source = f.read()
-                tree = ast.parse(source)
-            
-            for node in ast.walk(tree):
-                # Function definitions
-                if isinstance(node, ast.FunctionDef) and node.name == name:
-                    results.append({
-                        "file": str(file_path.relative_to(workspace)),
-                        "line": node.lineno,
-                        "kind": "function",
-                        "preview": f"def {node.name}(...)"
-                    })
-                
-                # Class definitions
-                elif isinstance(node, ast.ClassDef) and node.name == name:
-                    results.append({
-                        "file": str(file_path.relative_to(workspace)),
-                        "line": node.lineno,
-                        "kind": "class",
-                        "preview": f"class {node.name}"
-                    })
-                
-                # Variable assignments
-                elif isinstance(node, ast.Assign):
-                    for target in node.targets:
-                        if isinstance(target, ast.Name) and target.id == name:
-                            results.append({
-                                "file": str(file_path.relative_to(workspace)),
-                                "line": node.lineno,
-                                "kind": "assignment",
-                                "preview": f"{name} = ..."
-                            })
-        
-        except Exception:
-            continue
-    
+
+    paths = [path for path, _st in iter_source_files(workspace, ".py")]
+    with ThreadPoolExecutor(max_workers=_pool_size()) as pool:
+        for file_results in pool.map(
+            lambda path: _find_symbols_in_file(path, workspace, name), paths
+        ):
+            results.extend(file_results)
+
     return results
 
-def _should_ignore(path: Path) -> bool:
-    """Check if path should be ignored"""
-    ignore_patterns = [
-        ".git", "__pycache__", "node_modules", ".venv", "venv",
-        "dist", "build", ".pytest_cache", ".mypy_cache"
-    ]
-    
-    return any(pattern in str(path) for pattern in ignore_patterns)
+def _find_symbols_in_file(file_path: Path, workspace: Path, name: str) -> List[Dict[str, Any]]:
+    """Find definitions of name in a single file using AST"""
+    results = []
+    try:
+        # Cheap bytes prefilter: a file that never mentions the name
+        # cannot define it, so skip the AST parse entirely
+        source = file_path.read_bytes()
+        if name.encode("utf-8") not in source:
+            return results
+
+        tree = ast.parse(source)
+
+        for node in ast.walk(tree):
+            # Function definitions
+            if isinstance(node, ast.FunctionDef) and node.name == name:
+                results.append({
+                    "file": str(file_path.relative_to(workspace)),
+                    "line": node.lineno,
+                    "kind": "function",
+                    "preview": f"def {node.name}(...)"
+                })
+
+            # Class definitions
+            elif isinstance(node, ast.ClassDef) and node.name == name:
+                results.append({
+                    "file": str(file_path.relative_to(workspace)),
+                    "line": node.lineno,
+                    "kind": "class",
+                    "preview": f"class {node.name}"
+                })
+
+            # Variable assignments
+            elif isinstance(node, ast.Assign):
+                for target in node.targets:
+                    if isinstance(target, ast.Name) and target.id == name:
+                        results.append({
+                            "file": str(file_path.relative_to(workspace)),
+                            "line": node.lineno,
+                            "kind": "assignment",
+                            "preview": f"{name} = ..."
+                        })
+
+    except Exception:
+        pass
+
+    return results
 
-def _get_context(lines: List[str], line_num: int, context_size: int = 2) -> List[str]:
+def _get_context(raw: bytes, newlines: List[int], line_idx: int, context_size: int = 2) -> List[str]:
     """Get surrounding lines for context"""
-    start = max(0, line_num - context_size - 1)
-    end = min(len(lines), line_num + context_size)
-    return [line.strip() for line in lines[start:end]]
+    first = max(0, line_idx - context_size)
+    last = line_idx + context_size
+    start = newlines[first - 1] + 1 if first else 0
+    # Include the final newline so a trailing blank line survives splitlines
+    end = newlines[last] + 1 if last < len(newlines) else len(raw)
+    return [line.strip() for line in raw[start:end].decode("utf-8", "replace").splitlines()]
@@ -1,16 +1,33 @@
+import re
+import shlex
 import subprocess
 import os
 from typing import Dict, Any, Optional, List
 
-def run_command(cmd: str, env: Optional[Dict[str, str]] = None, timeout: int = 20) -> Dict[str, Any]:
+# Characters that require a shell to interpret (pipes, redirects,
+# globbing, variable expansion, ...)
+_SHELL_METACHARS = frozenset("|&;<>()$`*?[]{}~\n")
+
+# Stack-trace pattern, compiled once at import time. One alternation
+# covers both frame styles so long traces are scanned in a single pass:
+#   Python:     File "path", line X
+#   JavaScript: at ... (path:line:col)
+_TB_RE = re.compile(
+    r'File "(?P<pyf>[^"]+)", line (?P<pyl>\d+)'
+    r'|\((?P<jsf>[^:]+):(?P<jsl>\d+):(?P<jsc>\d+)\)'
+)
+
+def run_command(cmd: str, env: Optional[Dict[str, str]] = None, timeout: int = 20,
+                shell: bool = False) -> Dict[str, Any]:
     """
-    Execute shell command and capture output.
-    
+    Execute command and capture output.
+
     Args:
         cmd: Command to execute
         env: Environment variables
         timeout: Timeout in seconds
-    
+        shell: Force execution through the shell
+
     Returns:
         Dict with exit code, stdout, stderr
     """
@@ -19,11 +36,24 @@ def run_command(cmd: str, env: Optional[Dict[str, str]] = None, timeout: int = 2
         exec_env = os.environ.copy()
         if env:
             exec_env.update(env)
-        
+
+        # Plain commands skip the /bin/sh fork entirely; anything using
+        # shell metacharacters (pipes, redirects, globs) still goes
+        # through the shell so existing callers keep working
+        use_shell = shell or any(c in _SHELL_METACHARS for c in cmd)
+        if not use_shell:
+            try:
+                args = shlex.split(cmd)
+                if not args:
+                    use_shell = True
+            except ValueError:
+                # Unbalanced quotes etc. - let the shell sort it out
+                use_shell = True
+
         # Run command
         result = subprocess.run(
-            cmd,
-            shell=True,
+            cmd if use_shell else args,
+            shell=use_shell,
             capture_output=True,
             text=True,
             timeout=timeout,
@@ -74,34 +104,27 @@ def explain_trace(trace: str, snippets: Optional[List[str]] = None) -> Dict[str,
 
 def _parse_stack_trace(trace: str) -> List[Dict[str, Any]]:
     """Extract file and line numbers from stack trace"""
-    import re
-    
-    suspects = []
-    
-    # Python stack trace pattern: File "path", line X
-    python_pattern = r'File "([^"]+)", line (\d+)'
-    matches = re.findall(python_pattern, trace)
-    
-    for file_path, line_num in matches:
-        suspects.append({
-            "file": file_path,
-            "line": int(line_num),
-            "language": "python"
-        })
-    
-    # JavaScript stack trace pattern: at ... (path:line:col)
-    js_pattern = r'\(([^:]+):(\d+):(\d+)\)'
-    js_matches = re.findall(js_pattern, trace)
-    
-    for file_path, line_num, col_num in js_matches:
-        suspects.append({
-            "file": file_path,
-            "line": int(line_num),
-            "column": int(col_num),
-            "language": "javascript"
-        })
-    
-    return suspects
+    # Two lists keep the Python-then-JavaScript output order of the old
+    # two-pass implementation
+    py_suspects = []
+    js_suspects = []
+
+    for match in _TB_RE.finditer(trace):
+        if match.group("pyf") is not None:
+            py_suspects.append({
+                "file": match.group("pyf"),
+                "line": int(match.group("pyl")),
+                "language": "python"
+            })
+        else:
+            js_suspects.append({
+                "file": match.group("jsf"),
+                "line": int(match.group("jsl")),
+                "column": int(match.group("jsc")),
+                "language": "javascript"
+            })
+
+    return py_suspects + js_suspects
 
 def run_python_debugger(script_path: str, breakpoints: Optional[List[int]] = None) -> Dict[str, Any]:
     """
@@ -4,43 +4,52 @@ Uses GPT-4 to generate code fixes
 """
 
 import os
+import json
+import linecache
+from functools import lru_cache
 from typing import Dict, Any, Optional
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 
-def generate_fix(file_path: str, error: Dict[str, Any], context: Optional[str] = None) -> Dict[str, Any]:
-    """
-    Generate a fix for a code error using GPT-4
-    
-    Args:
-        file_path: Path to file with error
-        error: Error dict with line, message, etc.
-        context: Optional code context
-    
-    Returns:
-        Dict with diff, rationale, risk_level
-    """
-    api_key = os.getenv("OPENAI_API_KEY")
-    
-    if not api_key or api_key == "your_api_key_here":
-        return {
-            "diff": "# OpenAI API key required for fix generation",
-            "rationale": "Set OPENAI_API_KEY in .env to enable AI-powered fixes",
-            "risk_level": "unknown"
-        }
-    
-    try:
-        # Read file content
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        # Get context around error
-        error_line = error.get('line', 1)
-        start = max(0, error_line - 5)
-        end = min(len(lines), error_line + 5)
-        code_context = ''.join(lines[start:end])
-        
-        # Build prompt
-        prompt = f"""Fix this Python code error:
+_SYSTEM_MESSAGE = "You are a code fixing assistant. Generate minimal, safe fixes."
+
+# Clients are created once and reused so every fix after the first rides
+# the same keep-alive connection pool instead of paying TLS setup again
+@lru_cache(maxsize=1)
+def _client() -> OpenAI:
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+@lru_cache(maxsize=1)
+def _async_client() -> AsyncOpenAI:
+    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+def _missing_key_result() -> Dict[str, Any]:
+    return {
+        "diff": "# OpenAI API key required for fix generation",
+        "rationale": "Set OPENAI_API_KEY in .env to enable AI-powered fixes",
+        "risk_level": "unknown"
+    }
+
+def _failure_result(e: Exception) -> Dict[str, Any]:
+    return {
+        "diff": f"# Error generating fix: {str(e)}",
+        "rationale": "Fix generation failed",
+        "risk_level": "unknown"
+    }
+
+def _build_fix_prompt(file_path: str, error: Dict[str, Any]) -> str:
+    """Build the fix prompt with code context around the error line"""
+    # linecache keeps the split lines cached by mtime, so repeated fixes
+    # against the same file cost no further I/O
+    linecache.checkcache(file_path)
+    lines = linecache.getlines(file_path)
+
+    # Get context around error
+    error_line = error.get('line', 1)
+    start = max(0, error_line - 5)
+    end = min(len(lines), error_line + 5)
+    code_context = ''.join(lines[start:end])
+
+    return f"""Fix this Python code error:
 
 File: {file_path}
 Line {error_line}: {error.get('message', 'Unknown error')}
@@ -62,26 +71,68 @@ Output as JSON:
   "risk_level": "low|medium|high"
 }}
 """
-        
-        client = OpenAI(api_key=api_key)
-        
-        response = client.chat.completions.create(
+
+def generate_fix(file_path: str, error: Dict[str, Any], context: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Generate a fix for a code error using GPT-4
+
+    Args:
+        file_path: Path to file with error
+        error: Error dict with line, message, etc.
+        context: Optional code context
+
+    Returns:
+        Dict with diff, rationale, risk_level
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+
+    if not api_key or api_key == "your_api_key_here":
+        return _missing_key_result()
+
+    try:
+        prompt = _build_fix_prompt(file_path, error)
+
+        response = _client().chat.completions.create(
             model="gpt-4o-mini",
             messages=[
-                {"role": "system", "content": "You are a code fixing assistant. Generate minimal, safe fixes."},
+                {"role": "system", "content": _SYSTEM_MESSAGE},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.3,
             response_format={"type": "json_object"}
         )
-        
-        import json
+
         result = json.loads(response.choices[0].message.content)
         return result
-    
+
+    except Exception as e:
+        return _failure_result(e)
+
+async def generate_fix_async(file_path: str, error: Dict[str, Any], context: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Async variant of generate_fix; batch callers can asyncio.gather
+    several of these so fixes generate in parallel.
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+
+    if not api_key or api_key == "your_api_key_here":
+        return _missing_key_result()
+
+    try:
+        prompt = _build_fix_prompt(file_path, error)
+
+        response = await _async_client().chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": _SYSTEM_MESSAGE},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            response_format={"type": "json_object"}
+        )
+
+        result = json.loads(response.choices[0].message.content)
+        return result
+
     except Exception as e:
-        return {
-            "diff": f"# Error generating fix: {str(e)}",
-            "rationale": "Fix generation failed",
-            "risk_level": "unknown"
-        }
+        return _failure_result(e)
@@ -4,33 +4,87 @@ Handles various phrasings and natural language variations
 """
 
 import re
-from typing import Dict, List, Tuple, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple, Optional
 from .intent_schema import IntentType, SymbolScope
 
+# re2 compiles alternation-heavy patterns to a DFA (linear-time, no
+# backtracking), which suits the tier master regexes; optional dependency
+try:
+    import re2 as _re2
+except ImportError:
+    _re2 = None
+
 class IntentPattern:
     """Pattern matcher for intent detection"""
     
     def __init__(self, intent: IntentType, patterns: List[str], priority: int = 1):
         self.intent = intent
+        # Kept for introspection/debugging; matching goes through combined
         self.patterns = [re.compile(p, re.IGNORECASE) for p in patterns]
+        # One alternation per intent: a single C-level search replaces the
+        # Python loop over N separate patterns
+        self.combined = re.compile(
+            "|".join(f"(?:{p})" for p in patterns), re.IGNORECASE
+        )
         self.priority = priority
-    
+        # Confidence is a pure function of priority - compute it once here
+        # instead of on every match (higher priority = higher confidence)
+        self.confidence = min(0.95, 0.7 + (priority * 0.05))
+
     def match(self, text: str) -> Optional[float]:
         """
         Check if text matches this intent pattern
         Returns confidence score (0.0-1.0) or None
         """
-        for pattern in self.patterns:
-            if pattern.search(text):
-                # Higher priority = higher confidence
-                return min(0.95, 0.7 + (self.priority * 0.05))
+        if self.combined.search(text):
+            return self.confidence
         return None
 
+def trie_alternation(words: List[str]) -> str:
+    """
+    Build a prefix-factored regex alternation for literal words.
+
+    (find|fix|show|search) compiles to four independent branches; the
+    factored form (?:f(?:ind|ix)|s(?:how|earch)) lets the engine share
+    the common prefix transitions, so each input character drives at
+    most one branch set.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        branches = [
+            re.escape(char) + emit(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if "" in node:
+            # A word ends here but longer words continue - make the rest
+            # optional (greedy, so the longer word still wins)
+            return f"(?:{body})?" if len(branches) > 1 else f"{body}?"
+        return body
+
+    return f"(?:{emit(trie)})"
+
+# Trie-factored verb groups shared across the patterns below
+_FIND_ERROR_VERBS = trie_alternation(['find', 'show', 'check', 'detect', 'locate', 'search'])
+_FIND_SYMBOL_VERBS = trie_alternation(['find', 'show', 'locate', 'search', 'where'])
+_RUN_VERBS = trie_alternation(['run', 'execute', 'start', 'perform'])
+_FIX_VERBS = trie_alternation(['fix', 'correct', 'repair', 'resolve', 'solve'])
+
 # Comprehensive intent patterns
 INTENT_PATTERNS = [
     # FIND_ERRORS - High priority
     IntentPattern(IntentType.FIND_ERRORS, [
-        r'\b(find|show|check|detect|locate|search)\s+(for\s+)?(all\s+)?(syntax|runtime|logical|type)?\s*(error|bug|issue|problem|mistake)',
+        rf'\b{_FIND_ERROR_VERBS}\s+(for\s+)?(all\s+)?(syntax|runtime|logical|type)?\s*(error|bug|issue|problem|mistake)',
         r'\b(what\'?s|whats)\s+(wrong|broken|the\s+error|the\s+issue|the\s+problem)',
         r'\b(check|validate|verify|lint|analyze)\s+(this\s+)?(code|file|script)',
         r'\b(debug|diagnose|troubleshoot)',
@@ -41,7 +95,7 @@ INTENT_PATTERNS = [
     
     # FIND_SYMBOL - High priority
     IntentPattern(IntentType.FIND_SYMBOL, [
-        r'\b(find|show|locate|search|where)\s+(is|are|the)?\s*\w+\s+(defined|declared|used|called|modified|changed|written|read)',
+        rf'\b{_FIND_SYMBOL_VERBS}\s+(is|are|the)?\s*\w+\s+(defined|declared|used|called|modified|changed|written|read)',
         r'\b(where|show\s+me)\s+(is|are|does|do)?\s*\w+\s+(get|gets|is)?\s*(defined|declared|used|modified|changed|set|assigned)',
         r'\b(show|find|list)\s+(all\s+)?(uses|usages|references|calls|occurrences)\s+of',
         r'\b(show\s+me\s+all|find\s+all)\s+(uses|references|occurrences)',
@@ -74,7 +128,7 @@ INTENT_PATTERNS = [
     
     # RUN_TESTS - Medium priority
     IntentPattern(IntentType.RUN_TESTS, [
-        r'\b(run|execute|start|perform)\s+(the\s+)?(unit\s+)?(test|tests|testing)',
+        rf'\b{_RUN_VERBS}\s+(the\s+)?(unit\s+)?(test|tests|testing)',
         r'\b(test\s+this|test\s+the)\s+(code|file|function|class)',
         r'\b(run\s+pytest|run\s+jest|run\s+mocha|run\s+unittest)',
         r'\b(check\s+if\s+tests\s+pass)',
@@ -83,7 +137,7 @@ INTENT_PATTERNS = [
     
     # PROPOSE_FIX - High priority (but lower than FORMAT for "fix formatting")
     IntentPattern(IntentType.PROPOSE_FIX, [
-        r'\b(fix|correct|repair|resolve|solve)\s+(this|the|that)?\s*(error|bug|issue|problem|code)',
+        rf'\b{_FIX_VERBS}\s+(this|the|that)?\s*(error|bug|issue|problem|code)',
         r'\b(how\s+do\s+i\s+fix|how\s+to\s+fix|how\s+can\s+i\s+fix)',
         r'\b(suggest|propose|recommend)\s+(a\s+)?(fix|solution|correction)',
         r'\b(make\s+it\s+work|get\s+it\s+working)',
@@ -123,134 +177,322 @@ INTENT_PATTERNS = [
     ], priority=1),
 ]
 
+# Literal trigger words per intent. Every regex above requires at least one
+# of these words, so a single pass over the utterance can rule out whole
+# intents before any regex runs (multi-keyword prefilter).
+INTENT_TRIGGERS = {
+    IntentType.FIND_ERRORS: frozenset([
+        'find', 'show', 'check', 'detect', 'locate', 'search', 'what',
+        'validate', 'verify', 'lint', 'analyze', 'debug', 'diagnose',
+        'troubleshoot', 'any', 'got', 'have', 'why', 'syntax', 'type', 'runtime'
+    ]),
+    IntentType.FIND_SYMBOL: frozenset([
+        'find', 'show', 'locate', 'search', 'where', 'list', 'go', 'jump',
+        'navigate', 'what', 'which', 'track', 'trace', 'follow'
+    ]),
+    IntentType.EXPLAIN_CODE: frozenset([
+        'explain', 'describe', 'tell', 'what', 'how', 'help', 'can', 'walk',
+        'summarize', 'summary', 'break'
+    ]),
+    IntentType.EXPLAIN_TRACE: frozenset([
+        'explain', 'analyze', 'interpret', 'decode', 'what', 'why', 'root',
+        'stack', 'traceback'
+    ]),
+    IntentType.RUN_TESTS: frozenset([
+        'run', 'execute', 'start', 'perform', 'test', 'check', 'verify'
+    ]),
+    IntentType.PROPOSE_FIX: frozenset([
+        'fix', 'correct', 'repair', 'resolve', 'solve', 'how', 'suggest',
+        'propose', 'recommend', 'make', 'get', 'auto', 'quick'
+    ]),
+    IntentType.FORMAT_FILE: frozenset([
+        'format', 'prettify', 'beautify', 'clean', 'prettier', 'cleaner',
+        'readable', 'auto', 'reformat', 'style'
+    ]),
+    IntentType.RENAME_SYMBOL: frozenset([
+        'rename', 'change', 'refactor', 'update', 'call', 'name'
+    ]),
+    IntentType.NAVIGATE_TO: frozenset([
+        'go', 'jump', 'navigate', 'open', 'show', 'take', 'bring'
+    ]),
+    IntentType.APPLY_FIX: frozenset([
+        'apply', 'implement', 'use', 'accept', 'yes', 'go', 'do', 'make'
+    ]),
+}
+
+# Inverted at import: word -> intents it can trigger
+_KEYWORD_TO_INTENTS: Dict[str, Tuple[IntentType, ...]] = {}
+for _intent, _words in INTENT_TRIGGERS.items():
+    for _word in _words:
+        _KEYWORD_TO_INTENTS[_word] = _KEYWORD_TO_INTENTS.get(_word, ()) + (_intent,)
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+# Master regexes, one per priority tier: every intent of the tier becomes
+# a named group (name = intent value) in a single alternation, so a tier
+# is checked with one search and m.lastgroup names the winning intent.
+# Tiers are sorted by priority descending and the first hit returns
+# immediately - confidence is a function of priority alone, so no later
+# tier can beat an earlier match and there is nothing left to scan.
+# Group-name -> enum member, so the hot path resolves the winning intent
+# with a dict lookup instead of the IntentType(...) constructor call
+_INTENT_BY_VALUE: Dict[str, IntentType] = {intent.value: intent for intent in IntentType}
+
+def _build_tier_masters() -> Tuple[Tuple["re.Pattern", float, frozenset], ...]:
+    by_priority: Dict[int, List[IntentPattern]] = {}
+    for pattern in INTENT_PATTERNS:
+        by_priority.setdefault(pattern.priority, []).append(pattern)
+
+    masters = []
+    for priority in sorted(by_priority, reverse=True):
+        tier = by_priority[priority]
+        source = "|".join(
+            f"(?P<{p.intent.value}>{p.combined.pattern})" for p in tier
+        )
+        master = None
+        if _re2 is not None:
+            try:
+                master = _re2.compile(source, _re2.IGNORECASE)
+            except Exception:
+                # re2 rejects some constructs; use the backtracker then
+                master = None
+        if master is None:
+            master = re.compile(source, re.IGNORECASE)
+        masters.append((
+            master,
+            tier[0].confidence,
+            frozenset(p.intent for p in tier),
+        ))
+    return tuple(masters)
+
+_TIER_MASTERS: Tuple[Tuple["re.Pattern", float, frozenset], ...] = _build_tier_masters()
+
 def detect_intent_from_patterns(text: str) -> Tuple[IntentType, float]:
     """
     Detect intent using pattern matching
-    
+
     Returns:
         (intent_type, confidence_score)
     """
-    best_match = None
-    best_confidence = 0.0
-    
-    for pattern in INTENT_PATTERNS:
-        confidence = pattern.match(text)
-        if confidence and confidence > best_confidence:
-            best_match = pattern.intent
-            best_confidence = confidence
-    
-    # Default to EXPLAIN_CODE if no match
-    if not best_match:
+    # Voice commands repeat a lot ("run tests", "find errors", ...);
+    # normalize then memoize so repeats skip the regex work entirely.
+    # The cap also bounds what a runaway transcription can cost.
+    return _detect_intent_cached(text.strip()[:256])
+
+@lru_cache(maxsize=512)
+def _detect_intent_cached(text: str) -> Tuple[IntentType, float]:
+    # Single pass over the words to find which intents are even possible
+    candidates = set()
+    keyword_map = _KEYWORD_TO_INTENTS
+    for word in _WORD_RE.findall(text.lower()):
+        intents = keyword_map.get(word)
+        if intents:
+            candidates.update(intents)
+
+    # No trigger word at all - skip the regex scan entirely
+    if not candidates:
         return IntentType.EXPLAIN_CODE, 0.5
-    
-    return best_match, best_confidence
 
+    for master, confidence, tier_intents in _TIER_MASTERS:
+        if candidates.isdisjoint(tier_intents):
+            continue
+        match = master.search(text)
+        if match:
+            return _INTENT_BY_VALUE[match.lastgroup], confidence
+
+    # Default to EXPLAIN_CODE if no match
+    return IntentType.EXPLAIN_CODE, 0.5
+
+# Extractor patterns, compiled once at import instead of per call
+
+# Pattern: "find where X is/are/gets defined/used/modified"
+SYMBOL_PATTERNS = [re.compile(p, re.IGNORECASE) for p in [
+    r'\b(?:find|show|where|locate)\s+(?:is|are|the)?\s*(\w+)\s+(?:defined|declared|used|modified|changed)',
+    r'\b(?:where|show)\s+(?:is|are|does)?\s*(\w+)\s+(?:get|gets|is)?\s*(?:defined|used|modified|set)',
+    r'\b(?:references|uses|calls|occurrences)\s+(?:of|to)\s+(\w+)',
+    r'\b(?:symbol|variable|function|class)\s+(?:named|called)?\s*(\w+)',
+    r'\b(?:track|trace|follow)\s+(?:the\s+)?(?:symbol\s+)?(\w+)',
+    r'\b(?:all\s+uses\s+of|all\s+references\s+to)\s+(\w+)',
+    r'\b(?:definition\s+of)\s+(\w+)',
+    # Generic: quoted or camelCase/snake_case words (lower priority)
+    r'["\'](\w+)["\']',
+    r'\b([a-z]+[A-Z]\w+)\b',  # camelCase
+    r'\b([a-z]+_[a-z_]+)\b',  # snake_case
+]]
+
+FILE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in [
+    r'\b(\w+\.(?:py|js|ts|java|cpp|c|h|jsx|tsx|json|yaml|yml|md))\b',
+    r'(?:file|script)\s+(?:named|called)?\s*["\']?(\w+)["\']?',
+    r'(?:in|from)\s+["\']?(\w+\.(?:py|js|ts|java))["\']?',
+]]
+
+LINE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in [
+    r'\bline\s+(\d+)\b',
+    r'\bat\s+line\s+(\d+)\b',
+    r'\bon\s+line\s+(\d+)\b',
+    r'\b:(\d+)\b',  # file.py:42
+]]
+
+FUNCTION_PATTERNS = [re.compile(p, re.IGNORECASE) for p in [
+    r'\bfunction\s+(?:named|called)?\s*(\w+)',
+    r'\bmethod\s+(?:named|called)?\s*(\w+)',
+    r'\bdef\s+(\w+)',
+    r'\b(\w+)\s+function',
+]]
+
+# Common words that look like symbols but never are
+_SYMBOL_STOPWORDS = frozenset([
+    'this', 'that', 'the', 'is', 'are', 'get', 'gets', 'file', 'code',
+    'where', 'show', 'find', 'all'
+])
+
+# Words that make the keyword-driven SYMBOL_PATTERNS reachable at all;
+# the generic patterns additionally need a quote, underscore or capital
+_SYMBOL_GATE_WORDS = frozenset([
+    'find', 'show', 'where', 'locate', 'references', 'uses', 'calls',
+    'occurrences', 'symbol', 'variable', 'function', 'class', 'track',
+    'trace', 'follow', 'definition'
+])
+
+@lru_cache(maxsize=512)
 def extract_symbol_from_text(text: str) -> Optional[str]:
     """Extract symbol name from text using various patterns"""
-    
-    # Pattern: "find where X is/are/gets defined/used/modified"
-    patterns = [
-        r'\b(?:find|show|where|locate)\s+(?:is|are|the)?\s*(\w+)\s+(?:defined|declared|used|modified|changed)',
-        r'\b(?:where|show)\s+(?:is|are|does)?\s*(\w+)\s+(?:get|gets|is)?\s*(?:defined|used|modified|set)',
-        r'\b(?:references|uses|calls|occurrences)\s+(?:of|to)\s+(\w+)',
-        r'\b(?:symbol|variable|function|class)\s+(?:named|called)?\s*(\w+)',
-        r'\b(?:track|trace|follow)\s+(?:the\s+)?(?:symbol\s+)?(\w+)',
-        r'\b(?:all\s+uses\s+of|all\s+references\s+to)\s+(\w+)',
-        r'\b(?:definition\s+of)\s+(\w+)',
-        # Generic: quoted or camelCase/snake_case words (lower priority)
-        r'["\'](\w+)["\']',
-        r'\b([a-z]+[A-Z]\w+)\b',  # camelCase
-        r'\b([a-z]+_[a-z_]+)\b',  # snake_case
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+
+    # O(text) reachability check before ten regex scans: the keyword
+    # patterns need a trigger word, the generic ones a quote, an
+    # underscore or a capital (camelCase)
+    if ('_' not in text and '"' not in text and "'" not in text
+            and text == text.lower()
+            and _SYMBOL_GATE_WORDS.isdisjoint(_tokenize(text))):
+        return None
+
+    for pattern in SYMBOL_PATTERNS:
+        match = pattern.search(text)
         if match:
             symbol = match.group(1)
             # Filter out common words
-            if symbol.lower() not in ['this', 'that', 'the', 'is', 'are', 'get', 'gets', 'file', 'code', 'where', 'show', 'find', 'all']:
+            if symbol.lower() not in _SYMBOL_STOPWORDS:
                 return symbol
-    
+
     return None
 
+@lru_cache(maxsize=512)
 def extract_file_from_text(text: str) -> Optional[str]:
     """Extract filename from text"""
-    
-    # Pattern: filename with extension
-    patterns = [
-        r'\b(\w+\.(?:py|js|ts|java|cpp|c|h|jsx|tsx|json|yaml|yml|md))\b',
-        r'(?:file|script)\s+(?:named|called)?\s*["\']?(\w+)["\']?',
-        r'(?:in|from)\s+["\']?(\w+\.(?:py|js|ts|java))["\']?',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+
+    # Only the "file/script named X" pattern can match without a dot
+    if ('.' not in text and 'file' not in text.lower()
+            and 'script' not in text.lower()):
+        return None
+
+    for pattern in FILE_PATTERNS:
+        match = pattern.search(text)
         if match:
             return match.group(1)
-    
+
     return None
 
+# Keyword groups for the token-set checks below. Matching whole tokens
+# instead of substrings also stops e.g. "reset" triggering "set" or
+# "json" triggering "js".
+_WRITE_WORDS = frozenset(['modified', 'changed', 'written', 'set', 'assigned', 'updated'])
+_READ_WORDS = frozenset(['read', 'accessed', 'used', 'referenced'])
+_DECL_WORDS = frozenset(['defined', 'declared', 'created'])
+
+_PY_WORDS = frozenset(['python', 'pytest', 'django', 'flask'])
+_JS_WORDS = frozenset(['javascript', 'js', 'node', 'npm', 'react'])
+_TS_WORDS = frozenset(['typescript', 'ts', 'tsx'])
+_JAVA_WORDS = frozenset(['java', 'spring', 'maven'])
+
+# Tokens keep dots so filenames like "main.py" survive as one token and
+# can be matched by extension
+_TOKEN_RE = re.compile(r"[a-z0-9_.]+")
+
+def _tokenize(text_lower: str) -> frozenset:
+    return frozenset(_TOKEN_RE.findall(text_lower))
+
+@lru_cache(maxsize=512)
 def extract_scope_from_text(text: str) -> SymbolScope:
     """Determine if looking for reads, writes, or all references"""
-    
-    text_lower = text.lower()
-    
-    if any(word in text_lower for word in ['modified', 'changed', 'written', 'set', 'assigned', 'updated']):
+    return _scope_from_tokens(_tokenize(text.lower()))
+
+def _scope_from_tokens(tokens: frozenset) -> SymbolScope:
+    # Set intersection: O(1) hash probes per keyword group instead of a
+    # substring scan per keyword
+    if _WRITE_WORDS & tokens:
         return SymbolScope.WRITES
-    elif any(word in text_lower for word in ['read', 'accessed', 'used', 'referenced']):
+    elif _READ_WORDS & tokens:
         return SymbolScope.READS
-    elif any(word in text_lower for word in ['defined', 'declared', 'created']):
+    elif _DECL_WORDS & tokens:
         return SymbolScope.DECLARATIONS
-    
+
     return SymbolScope.ALL
 
+@lru_cache(maxsize=512)
 def extract_line_number(text: str) -> Optional[int]:
     """Extract line number from text"""
-    
-    patterns = [
-        r'\bline\s+(\d+)\b',
-        r'\bat\s+line\s+(\d+)\b',
-        r'\bon\s+line\s+(\d+)\b',
-        r'\b:(\d+)\b',  # file.py:42
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+
+    # No digit anywhere means none of the patterns can match
+    if not any(c.isdigit() for c in text):
+        return None
+
+    for pattern in LINE_PATTERNS:
+        match = pattern.search(text)
         if match:
             return int(match.group(1))
-    
+
     return None
 
+@lru_cache(maxsize=512)
 def extract_function_name(text: str) -> Optional[str]:
     """Extract function name from text"""
-    
-    patterns = [
-        r'\bfunction\s+(?:named|called)?\s*(\w+)',
-        r'\bmethod\s+(?:named|called)?\s*(\w+)',
-        r'\bdef\s+(\w+)',
-        r'\b(\w+)\s+function',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+
+    # Every pattern anchors on one of these words ('def' also covers
+    # 'defined', which is a harmless false pass)
+    lowered = text.lower()
+    if 'function' not in lowered and 'method' not in lowered and 'def' not in lowered:
+        return None
+
+    for pattern in FUNCTION_PATTERNS:
+        match = pattern.search(text)
         if match:
             return match.group(1)
-    
+
     return None
 
+@lru_cache(maxsize=256)
 def detect_language_from_text(text: str) -> str:
     """Detect programming language from text"""
-    
-    text_lower = text.lower()
-    
-    if any(word in text_lower for word in ['python', '.py', 'pytest', 'django', 'flask']):
+    return _language_from_tokens(_tokenize(text.lower()))
+
+def _language_from_tokens(tokens: frozenset) -> str:
+    if _PY_WORDS & tokens or any(t.endswith('.py') for t in tokens):
         return "python"
-    elif any(word in text_lower for word in ['javascript', 'js', '.js', 'node', 'npm', 'react']):
+    elif _JS_WORDS & tokens or any(t.endswith('.js') for t in tokens):
         return "javascript"
-    elif any(word in text_lower for word in ['typescript', 'ts', '.ts', 'tsx']):
+    elif _TS_WORDS & tokens or any(t.endswith(('.ts', '.tsx')) for t in tokens):
         return "typescript"
-    elif any(word in text_lower for word in ['java', '.java', 'spring', 'maven']):
+    elif _JAVA_WORDS & tokens or any(t.endswith('.java') for t in tokens):
         return "java"
-    
+
     # Default to python
     return "python"
+
+def extract_entities(text: str) -> Dict[str, Any]:
+    """
+    Run every entity extractor over one utterance.
+
+    The case-insensitive extractors each lowercased the text on their
+    own; this entry point lowercases it once and shares it. A single
+    fused regex over all categories would change the per-category
+    first-match precedence, so each category keeps its own patterns.
+    """
+    tokens = _tokenize(text.lower())
+    return {
+        "symbol": extract_symbol_from_text(text),
+        "file": extract_file_from_text(text),
+        "line": extract_line_number(text),
+        "function": extract_function_name(text),
+        "scope": _scope_from_tokens(tokens),
+        "language": _language_from_tokens(tokens),
+    }
@@ -14,11 +14,11 @@ class IntentRouter:
     
     def __init__(self):
         self.handlers: Dict[IntentType, Callable] = {}
-        self.destructive_intents = {
+        self.destructive_intents = frozenset({
             IntentType.APPLY_FIX,
             IntentType.RENAME_SYMBOL,
             IntentType.FORMAT_FILE
-        }
+        })
     
     def register_handler(self, intent_type: IntentType, handler: Callable):
         """Register a handler function for an intent"""
@@ -36,8 +36,9 @@ class IntentRouter:
         Returns:
             Handler result or confirmation request
         """
-        # Check if intent requires confirmation
-        if self._is_destructive(intent) and require_confirmation:
+        # Check if intent requires confirmation (containment inlined -
+        # this runs on every route)
+        if require_confirmation and intent.intent in self.destructive_intents:
             return {
                 "status": "confirmation_required",
                 "intent": intent.intent,
@@ -71,10 +72,6 @@ class IntentRouter:
                 "message": str(e)
             }
     
-    def _is_destructive(self, intent: Intent) -> bool:
-        """Check if intent is destructive (modifies code)"""
-        return intent.intent in self.destructive_intents
-    
     def get_registered_intents(self) -> list:
         """Get list of registered intent types"""
         return list(self.handlers.keys())
@@ -88,34 +85,38 @@ def get_router() -> IntentRouter:
 
 def register_handlers():
     """Register all default handlers"""
-    from .code_parser import search_code, find_symbols
-    from .debugger_interface import run_command, explain_trace
-    
     router = get_router()
-    
-    # Register handlers
+
+    # Handlers import their subsystem on first use, so registering them
+    # stays cheap and only the intents actually spoken pull code in
     router.register_handler(
         IntentType.FIND_SYMBOL,
-        lambda entities: find_symbols(entities.symbol or "", entities.language)
+        lambda entities: _find_symbol_handler(entities)
     )
-    
+
     router.register_handler(
         IntentType.FIND_ERRORS,
         lambda entities: _find_errors_handler(entities)
     )
-    
+
     router.register_handler(
         IntentType.EXPLAIN_CODE,
         lambda entities: _explain_code_handler(entities)
     )
-    
+
     router.register_handler(
         IntentType.RUN_TESTS,
         lambda entities: _run_tests_handler(entities)
     )
-    
+
     # Add more handlers as needed
 
+def _find_symbol_handler(entities) -> Any:
+    """Handler for finding symbols"""
+    from .code_parser import find_symbols
+
+    return find_symbols(entities.symbol or "", entities.language)
+
 def _find_errors_handler(entities) -> Dict[str, Any]:
     """Handler for finding errors"""
     from .linter import find_errors
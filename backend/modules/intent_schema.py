@@ -3,8 +3,9 @@ Intent Schema and Validation for EchoDebug
 Defines all valid intents and their entity structures
 """
 
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field
 from enum import Enum
 
 class IntentType(str, Enum):
@@ -51,21 +52,22 @@ class IntentEntities(BaseModel):
         validate_default = True
 
 class Intent(BaseModel):
-    """Structured intent representation"""
+    """
+    Structured intent representation.
+
+    Stays a pydantic model because this is the trust boundary for LLM
+    output (validate_intent); internal producers that already hold
+    trusted values construct it via model_construct and skip validation,
+    which is where a dataclass would have saved its cost anyway.
+    """
     intent: IntentType
     confidence: float = Field(ge=0.0, le=1.0)
     entities: IntentEntities
     follow_up_allowed: bool = True
     raw_text: Optional[str] = None
-    
+
     class Config:
         use_enum_values = True
-    
-    @validator('confidence')
-    def validate_confidence(cls, v):
-        if not 0.0 <= v <= 1.0:
-            raise ValueError('Confidence must be between 0 and 1')
-        return v
 
 # Intent descriptions for LLM prompt
 INTENT_DESCRIPTIONS = {
@@ -121,8 +123,9 @@ INTENT_EXAMPLES = {
     ]
 }
 
+@lru_cache(maxsize=1)
 def get_intent_prompt() -> str:
-    """Generate system prompt for LLM intent classification"""
+    """Generate system prompt for LLM intent classification (built once)"""
     intents_list = "\n".join([
         f"- {intent.value}: {desc}"
         for intent, desc in INTENT_DESCRIPTIONS.items()
@@ -162,3 +165,19 @@ Rules:
 def validate_intent(intent_data: Dict[str, Any]) -> Intent:
     """Validate and parse intent data"""
     return Intent(**intent_data)
+
+def intent_from_parsed(intent_data: Dict[str, Any]) -> Intent:
+    """
+    Rebuild an Intent from parse_intent output without re-validating.
+
+    parse_intent only ever returns the dict form of an already-validated
+    Intent, so the routing path can skip the second validation pass.
+    """
+    entities = intent_data.get("entities") or {}
+    return Intent.model_construct(
+        intent=intent_data["intent"],
+        confidence=intent_data["confidence"],
+        entities=IntentEntities.model_construct(**entities),
+        follow_up_allowed=intent_data.get("follow_up_allowed", True),
+        raw_text=intent_data.get("raw_text"),
+    )
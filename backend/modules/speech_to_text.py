@@ -1,9 +1,49 @@
 import base64
+import hashlib
+import io
 import os
 import tempfile
-from typing import Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
 from openai import OpenAI
 
+@lru_cache(maxsize=1)
+def _get_client(api_key: str) -> OpenAI:
+    """One shared client so consecutive calls reuse the warm HTTPS pool"""
+    return OpenAI(api_key=api_key)
+
+# Transcripts are immutable for a given clip, so cache them keyed by a
+# hash of the audio bytes: an in-process dict for the session, backed by
+# small files under the temp dir so repeated dev/demo clips survive
+# restarts without another Whisper round trip
+_CACHE_DIR = Path(tempfile.gettempdir()) / "echodebug_stt"
+_transcript_cache: Dict[str, str] = {}
+
+def _audio_key(audio_bytes: bytes) -> str:
+    # blake2b is the fastest hash in hashlib on CPython
+    return hashlib.blake2b(audio_bytes, digest_size=16).hexdigest()
+
+def _cached_transcript(key: str) -> Optional[str]:
+    text = _transcript_cache.get(key)
+    if text is not None:
+        return text
+    try:
+        text = (_CACHE_DIR / f"{key}.txt").read_text(encoding="utf-8")
+    except OSError:
+        return None
+    _transcript_cache[key] = text
+    return text
+
+def _store_transcript(key: str, text: str) -> None:
+    _transcript_cache[key] = text
+    try:
+        _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        (_CACHE_DIR / f"{key}.txt").write_text(text, encoding="utf-8")
+    except OSError:
+        # Cache is best-effort; a read-only temp dir just means no reuse
+        pass
+
 def transcribe_audio(audio_data: str, format: str = "wav") -> str:
     """
     Convert audio to text using OpenAI Whisper API.
@@ -24,33 +64,52 @@ def transcribe_audio(audio_data: str, format: str = "wav") -> str:
     try:
         # Decode audio data
         audio_bytes = base64.b64decode(audio_data)
-        
-        # Create temporary file for Whisper API
-        with tempfile.NamedTemporaryFile(suffix=f".{format}", delete=False) as temp_file:
-            temp_file.write(audio_bytes)
-            temp_path = temp_file.name
-        
-        try:
-            # Call OpenAI Whisper API
-            client = OpenAI(api_key=api_key)
-            
-            with open(temp_path, "rb") as audio_file:
-                transcript = client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    language="en"  # Can be auto-detected by omitting this
-                )
-            
-            return transcript.text.strip()
-        
-        finally:
-            # Clean up temp file
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
-    
+        return transcribe_audio_bytes(audio_bytes, f"audio.{format}")
+
     except Exception as e:
         raise Exception(f"STT error: {str(e)}")
 
+def transcribe_audio_bytes(audio_bytes: bytes, filename: str = "audio.wav") -> str:
+    """
+    Transcribe raw audio bytes (shared by the base64, file and upload paths).
+
+    Args:
+        audio_bytes: Raw audio file contents
+        filename: Name carrying the format extension for the SDK
+
+    Returns:
+        Transcribed text
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+
+    if not api_key or api_key == "your_api_key_here":
+        # Fallback to mock for testing
+        return "find all syntax errors in main.py"
+
+    key = _audio_key(audio_bytes)
+    cached = _cached_transcript(key)
+    if cached is not None:
+        return cached
+
+    # Hand Whisper an in-memory buffer instead of round-tripping the
+    # bytes through a temp file; the .name attribute is how the SDK
+    # learns the format
+    buffer = io.BytesIO(audio_bytes)
+    buffer.name = filename
+
+    # Call OpenAI Whisper API
+    client = _get_client(api_key)
+
+    transcript = client.audio.transcriptions.create(
+        model="whisper-1",
+        file=buffer,
+        language="en"  # Can be auto-detected by omitting this
+    )
+
+    text = transcript.text.strip()
+    _store_transcript(key, text)
+    return text
+
 def transcribe_audio_file(file_path: str) -> str:
     """
     Transcribe audio from file path.
@@ -67,16 +126,10 @@ def transcribe_audio_file(file_path: str) -> str:
         return "find all syntax errors in main.py"
     
     try:
-        client = OpenAI(api_key=api_key)
-        
-        with open(file_path, "rb") as audio_file:
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                language="en"
-            )
-        
-        return transcript.text.strip()
-    
+        with open(file_path, "rb") as f:
+            audio_bytes = f.read()
+
+        return transcribe_audio_bytes(audio_bytes, os.path.basename(file_path))
+
     except Exception as e:
         raise Exception(f"STT error: {str(e)}")
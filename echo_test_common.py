@@ -0,0 +1,27 @@
+"""
+Shared helpers for the EchoDebug test and recorder scripts.
+"""
+
+import requests
+
+BASE_URL = "http://localhost:8000"
+
+def make_session(pool_maxsize=4):
+    """One keep-alive session: callers reuse pooled TCP connections
+    instead of reconnecting per request"""
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(
+        pool_connections=1, pool_maxsize=pool_maxsize))
+    return session
+
+def ensure_server(session, base_url=BASE_URL, timeout=2.0):
+    """Probe the API root, failing fast instead of hanging on TCP retries.
+
+    Returns True when the server answers 200. The probe's keep-alive
+    connection stays in the session pool, so the first real request
+    skips its TCP handshake.
+    """
+    try:
+        return session.get(f"{base_url}/", timeout=timeout).status_code == 200
+    except requests.RequestException:
+        return False
@@ -8,6 +8,8 @@ import soundfile as sf
 import requests
 import numpy as np
 import os
+from pathlib import Path
+from functools import lru_cache
 from dotenv import load_dotenv
 
 # Load environment
@@ -18,6 +20,32 @@ SAMPLE_RATE = 16000
 DURATION = 5
 API_URL = "http://localhost:8000"
 
+# One keep-alive session: every call in a voice iteration reuses the
+# same pooled TCP connection instead of reconnecting per request
+SESSION = requests.Session()
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+# Resolve the working directory once; abspath() would re-run the
+# getcwd() syscall on every recording
+BASE_DIR = os.getcwd()
+
+@lru_cache(maxsize=1)
+def best_input_device():
+    """Probe once for an input device that natively does 16 kHz mono int16.
+
+    Opening a stream with an explicit working device skips PortAudio's
+    per-open format negotiation fallbacks.
+    """
+    for idx, device in enumerate(sd.query_devices()):
+        if device['max_input_channels'] >= 1:
+            try:
+                sd.check_input_settings(device=idx, samplerate=SAMPLE_RATE,
+                                        channels=1, dtype='int16')
+                return idx
+            except Exception:
+                continue
+    return None  # let PortAudio pick
+
 def record_audio():
     """Record audio from microphone"""
     print("\n🎙️  GET READY...")
@@ -36,20 +64,19 @@ def record_audio():
         int(DURATION * SAMPLE_RATE),
         samplerate=SAMPLE_RATE,
         channels=1,
-        dtype='float32'
+        dtype='int16',
+        device=best_input_device()
     )
     
-    # Show countdown
-    for i in range(DURATION, 0, -1):
-        print(f"   {i} seconds left...", end='\r', flush=True)
-        time.sleep(1)
-    
+    # Recording runs in the background; one blocking wait replaces the
+    # per-second sleep+print wakeups
+    print(f"   (recording for {DURATION} seconds...)", flush=True)
     sd.wait()
     
     print("\n\n✅ Recording complete!")
     
     # Check audio level
-    max_vol = np.max(np.abs(audio))
+    max_vol = np.max(np.abs(audio)) / 32768.0
     print(f"   Audio level: {max_vol:.3f}")
     
     if max_vol < 0.01:
@@ -57,11 +84,27 @@ def record_audio():
     
     return audio
 
+def trim_silence(audio, threshold=0.01, pad_seconds=0.1):
+    """Clip leading/trailing silence so Whisper only sees speech"""
+    if audio.dtype.kind == 'i':
+        # int16 capture: scale the normalized threshold to sample units
+        threshold = int(threshold * 32768)
+    mask = np.abs(audio[:, 0]) > threshold
+    if not mask.any():
+        return audio
+    start = int(mask.argmax())
+    end = len(mask) - int(mask[::-1].argmax())
+    pad = int(pad_seconds * SAMPLE_RATE)
+    return audio[max(0, start - pad):min(len(audio), end + pad)]
+
 def save_and_transcribe(audio):
     """Save audio and send to Whisper"""
-    # Save with absolute path
-    filename = os.path.abspath("temp_audio.wav")
-    sf.write(filename, audio, SAMPLE_RATE)
+    # Trim dead air first - Whisper latency scales with clip length
+    audio = trim_silence(audio)
+
+    # Save with absolute path (base directory cached at startup)
+    filename = os.path.join(BASE_DIR, "temp_audio.wav")
+    sf.write(filename, audio, SAMPLE_RATE, subtype='PCM_16')
     print(f"\n💾 Saved audio file")
     
     # Check if we have API credits
@@ -71,11 +114,14 @@ def save_and_transcribe(audio):
     print("📤 Sending to Whisper API...")
     
     try:
-        response = requests.post(
-            f"{API_URL}/stt/file",
-            json={"file_path": filename}
-        )
-        
+        # Multipart upload: raw WAV bytes, no base64 inflation and no
+        # shared-filesystem assumption between recorder and server
+        with open(filename, "rb") as f:
+            response = SESSION.post(
+                f"{API_URL}/stt/upload",
+                files={"audio": (os.path.basename(filename), f, "audio/wav")}
+            )
+
         if response.status_code == 200:
             text = response.json().get('text', '')
             
@@ -112,8 +158,8 @@ def save_and_transcribe(audio):
         return text
     finally:
         # Clean up
-        if os.path.exists(filename):
-            os.remove(filename)
+        # One unlink syscall, no exists() race
+        Path(filename).unlink(missing_ok=True)
 
 def execute_command(text):
     """Execute the command"""
@@ -123,7 +169,7 @@ def execute_command(text):
     print("\n⚡ Executing command...")
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{API_URL}/intent/route",
             json={"text": text}
         )
@@ -152,7 +198,7 @@ def main():
     
     # Check server
     try:
-        r = requests.get(f"{API_URL}/")
+        r = SESSION.get(f"{API_URL}/")
         if r.status_code != 200:
             print("\n❌ Server not running!")
             print("   Start with: python backend/main.py")
@@ -8,8 +8,12 @@ import sounddevice as sd
 import soundfile as sf
 import requests
 import numpy as np
+import json
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from functools import lru_cache
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -20,6 +24,36 @@ SAMPLE_RATE = 16000  # Whisper works best with 16kHz
 DURATION = 5  # seconds
 API_URL = "http://localhost:8000"
 
+# One keep-alive session: every call in a voice iteration reuses the
+# same pooled TCP connection instead of reconnecting per request
+SESSION = requests.Session()
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+# Resolve the working directory once; abspath() would re-run the
+# getcwd() syscall on every recording
+BASE_DIR = os.getcwd()
+
+# Background worker for uploads so transcription latency can overlap
+# with console work in the main loop
+EXECUTOR = ThreadPoolExecutor(max_workers=2)
+
+@lru_cache(maxsize=1)
+def best_input_device():
+    """Probe once for an input device that natively does 16 kHz mono int16.
+
+    Opening a stream with an explicit working device skips PortAudio's
+    per-open format negotiation fallbacks.
+    """
+    for idx, device in enumerate(sd.query_devices()):
+        if device['max_input_channels'] >= 1:
+            try:
+                sd.check_input_settings(device=idx, samplerate=SAMPLE_RATE,
+                                        channels=1, dtype='int16')
+                return idx
+            except Exception:
+                continue
+    return None  # let PortAudio pick
+
 def record_audio(duration=5):
     """Record audio from microphone with visual feedback"""
     print(f"\n🎙️  Recording for {duration} seconds...")
@@ -31,21 +65,19 @@ def record_audio(duration=5):
         int(duration * SAMPLE_RATE),
         samplerate=SAMPLE_RATE,
         channels=1,
-        dtype='float32'
+        dtype='int16',
+        device=best_input_device()
     )
     
-    # Show progress bar while recording
-    import time
-    for i in range(duration):
-        print("🔴", end=' ', flush=True)
-        time.sleep(1)
-    
+    # Recording runs in the background; one blocking wait replaces the
+    # per-second sleep+print wakeups
+    print("🔴 recording...", flush=True)
     sd.wait()  # Wait until recording is finished
     
     print("\n\n   ✓ Recording complete!")
     
     # Show audio level
-    max_volume = np.max(np.abs(audio))
+    max_volume = np.max(np.abs(audio)) / 32768.0
     if max_volume < 0.01:
         print("   ⚠️  Warning: Very low audio detected. Speak louder!")
     elif max_volume > 0.8:
@@ -55,11 +87,27 @@ def record_audio(duration=5):
     
     return audio
 
+def trim_silence(audio, threshold=0.01, pad_seconds=0.1):
+    """Clip leading/trailing silence so Whisper only sees speech"""
+    if audio.dtype.kind == 'i':
+        # int16 capture: scale the normalized threshold to sample units
+        threshold = int(threshold * 32768)
+    mask = np.abs(audio[:, 0]) > threshold
+    if not mask.any():
+        return audio
+    start = int(mask.argmax())
+    end = len(mask) - int(mask[::-1].argmax())
+    pad = int(pad_seconds * SAMPLE_RATE)
+    return audio[max(0, start - pad):min(len(audio), end + pad)]
+
 def save_audio(audio, filename="temp_audio.wav"):
     """Save audio to file"""
-    # Use absolute path
-    abs_filename = os.path.abspath(filename)
-    sf.write(abs_filename, audio, SAMPLE_RATE)
+    # Trim dead air first - Whisper latency scales with clip length
+    audio = trim_silence(audio)
+
+    # Use absolute path (base directory cached at startup)
+    abs_filename = os.path.join(BASE_DIR, filename)
+    sf.write(abs_filename, audio, SAMPLE_RATE, subtype='PCM_16')
     return abs_filename
 
 def transcribe_audio_file(filename):
@@ -67,10 +115,13 @@ def transcribe_audio_file(filename):
     print(f"\n📤 Sending to Whisper API...")
     
     try:
-        response = requests.post(
-            f"{API_URL}/stt/file",
-            json={"file_path": filename}
-        )
+        # Multipart upload: raw WAV bytes, no base64 inflation and no
+        # shared-filesystem assumption between recorder and server
+        with open(filename, "rb") as f:
+            response = SESSION.post(
+                f"{API_URL}/stt/upload",
+                files={"audio": (os.path.basename(filename), f, "audio/wav")}
+            )
         
         if response.status_code == 200:
             result = response.json()
@@ -87,7 +138,7 @@ def parse_intent(text):
     print(f"\n🧠 Parsing intent...")
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{API_URL}/intent",
             json={"text": text}
         )
@@ -106,7 +157,7 @@ def execute_intent(text):
     print(f"\n⚡ Executing command...")
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{API_URL}/intent/route",
             json={"text": text}
         )
@@ -131,20 +182,15 @@ def test_microphone():
             int(2 * SAMPLE_RATE),
             samplerate=SAMPLE_RATE,
             channels=1,
-            dtype='float32'
+            dtype='int16',
+            device=best_input_device()
         )
         
-        # Show visual feedback
-        import time
-        print("   ", end='', flush=True)
-        for i in range(2):
-            print("🔴", end=' ', flush=True)
-            time.sleep(1)
-        
+        print("   🔴 recording...", flush=True)
         sd.wait()
         
         # Check audio level
-        max_volume = np.max(np.abs(test_audio))
+        max_volume = np.max(np.abs(test_audio)) / 32768.0
         
         print(f"\n\n   ✓ Microphone working!")
         print(f"   Audio level: {max_volume:.3f}")
@@ -172,7 +218,7 @@ def main():
     
     # Check if server is running
     try:
-        response = requests.get(f"{API_URL}/")
+        response = SESSION.get(f"{API_URL}/")
         if response.status_code != 200:
             print("\n❌ Server not running!")
             print("   Start with: python backend/main.py")
@@ -210,13 +256,19 @@ def main():
         
         # Record audio
         audio = record_audio(duration=DURATION)
-        
+
         # Save to file
         filename = save_audio(audio)
-        
-        # Transcribe (if API key is set, otherwise use mock)
+
+        # Kick off the upload in the background so the Whisper round trip
+        # overlaps with the console output below
+        upload = None
         if api_key and api_key != "your_api_key_here":
-            text = transcribe_audio_file(filename)
+            upload = EXECUTOR.submit(transcribe_audio_file, filename)
+
+        # Transcribe (if API key is set, otherwise use mock)
+        if upload is not None:
+            text = upload.result()
         else:
             # Mock transcription for testing
             print("\n📝 Mock transcription (add API key for real Whisper)")
@@ -233,24 +285,28 @@ def main():
         print(f"\n  \"{text}\"\n")
         print("="*60)
         
+        # The display-only parse and the routing call are independent;
+        # fire both at once so the iteration waits max(t1, t2), not t1+t2
+        intent_future = EXECUTOR.submit(parse_intent, text)
+        result_future = EXECUTOR.submit(execute_intent, text)
+
         # Parse intent
-        intent = parse_intent(text)
+        intent = intent_future.result()
         if intent:
             print(f"   Intent: {intent['intent']}")
             print(f"   Confidence: {intent['confidence']}")
-        
+
         # Execute
-        result = execute_intent(text)
+        result = result_future.result()
         if result:
             print(f"\n✅ Result:")
             print(f"   Status: {result.get('status')}")
             if result.get('result'):
-                import json
                 print(f"   {json.dumps(result['result'][:2] if isinstance(result['result'], list) else result['result'], indent=6)}")
         
         # Clean up
-        if os.path.exists(filename):
-            os.remove(filename)
+        # One unlink syscall, no exists() race
+        Path(filename).unlink(missing_ok=True)
 
 if __name__ == "__main__":
     try:
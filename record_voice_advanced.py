@@ -12,6 +12,9 @@ import sys
 import os
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from functools import lru_cache
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -22,22 +25,111 @@ SAMPLE_RATE = 16000
 DURATION = 5
 API_URL = "http://localhost:8000"
 
+# One keep-alive session: every call in a voice iteration reuses the
+# same pooled TCP connection instead of reconnecting per request
+SESSION = requests.Session()
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+# Background worker for uploads so transcription latency can overlap
+# with console work in the main loop
+EXECUTOR = ThreadPoolExecutor(max_workers=2)
+
 # Global flag for recording status
 is_recording = False
-audio_buffer = []
+
+# Preallocated capture buffer written by the realtime callback; a write
+# cursor into fixed storage keeps the callback allocation-free and makes
+# the final audio a plain slice instead of a concatenate-copy
+audio_buffer = None
+audio_pos = 0
+
+# Simple energy-based voice activity detection: once speech has been
+# heard, half a second of continuous silence requests an early stop so
+# a short command doesn't wait out the full recording window
+SPEECH_RMS = 0.02
+SILENCE_STOP_SECONDS = 0.5
+
+# Volume-bar strings precomputed for every (indicator, length) pair so
+# the callback never builds them; the counter drives the display throttle
+BAR_PREFIXES = {
+    (ind, n): f"\r   🎤 {ind * n:<20} " for ind in "░▒▓█" for n in range(21)
+}
+BAR_EVERY = 4
+bar_blocks = [0]
+speech_started = False
+silent_samples = 0
+stop_requested = False
+
+@lru_cache(maxsize=1)
+def best_input_device():
+    """Probe once for an input device that natively does 16 kHz mono int16.
+
+    Opening a stream with an explicit working device skips PortAudio's
+    per-open format negotiation fallbacks.
+    """
+    for idx, device in enumerate(sd.query_devices()):
+        if device['max_input_channels'] >= 1:
+            try:
+                sd.check_input_settings(device=idx, samplerate=SAMPLE_RATE,
+                                        channels=1, dtype='int16')
+                return idx
+            except Exception:
+                continue
+    return None  # let PortAudio pick
+
+def reset_capture(seconds):
+    """Allocate the capture buffer for a recording of `seconds`"""
+    global audio_buffer, audio_pos, speech_started, silent_samples, stop_requested
+    # One extra second of headroom for stream start/stop jitter
+    audio_buffer = np.empty((int((seconds + 1) * SAMPLE_RATE), 1), dtype=np.int16)
+    audio_pos = 0
+    speech_started = False
+    silent_samples = 0
+    stop_requested = False
+
+def captured_audio():
+    """Return the recorded audio so far (or None if nothing arrived)"""
+    if audio_buffer is None or audio_pos == 0:
+        return None
+    return audio_buffer[:audio_pos]
 
 def audio_callback(indata, frames, time_info, status):
     """Callback for real-time audio processing"""
-    global audio_buffer
+    global audio_pos, speech_started, silent_samples, stop_requested
     if status:
         print(f"Status: {status}", file=sys.stderr)
+
+    # Store audio data (extra blocks past the headroom are dropped)
+    end = audio_pos + len(indata)
+    if audio_buffer is not None and end <= len(audio_buffer):
+        audio_buffer[audio_pos:end] = indata
+        audio_pos = end
+
+    # Calculate volume level. One small normalized float copy per block
+    # (int16 capture), then a plain dot product - same sum-of-squares as
+    # np.linalg.norm without its dispatch overhead; this runs on the
+    # realtime audio thread, so keep it tight
+    flat = indata.ravel().astype(np.float32)
+    flat /= 32768.0
+    energy = float(np.dot(flat, flat))
+    volume = energy ** 0.5 * 10
+
+    # Voice activity: flag an early stop after trailing silence
+    rms = (energy / len(flat)) ** 0.5 if len(flat) else 0.0
+    if rms > SPEECH_RMS:
+        speech_started = True
+        silent_samples = 0
+    elif speech_started:
+        silent_samples += len(indata)
+        if silent_samples >= SILENCE_STOP_SECONDS * SAMPLE_RATE:
+            stop_requested = True
     
-    # Store audio data
-    audio_buffer.append(indata.copy())
-    
-    # Calculate volume level
-    volume = np.linalg.norm(indata) * 10
-    
+    # Throttle the display to every 4th block (~20 Hz): each print is a
+    # lock plus a write syscall, which has no place on the audio thread
+    bar_blocks[0] += 1
+    if bar_blocks[0] % BAR_EVERY:
+        return
+
     # Visual feedback based on volume
     if volume < 1:
         indicator = "░"  # Very quiet
@@ -47,46 +139,60 @@ def audio_callback(indata, frames, time_info, status):
         indicator = "▓"  # Medium
     else:
         indicator = "█"  # Loud
-    
-    # Print volume bar
+
+    # Print volume bar from the precomputed prefixes
     bar_length = int(min(volume, 20))
-    bar = indicator * bar_length
-    print(f"\r   🎤 {bar:<20} {volume:.1f}", end='', flush=True)
+    sys.stdout.write(BAR_PREFIXES[indicator, bar_length] + f"{volume:.1f}")
+    sys.stdout.flush()
 
 def record_with_visualization(duration=5):
     """Record audio with real-time visualization"""
-    global is_recording, audio_buffer
-    
+    global is_recording
+
     print(f"\n🎙️  Recording for {duration} seconds...")
     print("   Watch the bars - they show your voice level!")
     print("   Speak clearly into your microphone...\n")
     
     is_recording = True
-    audio_buffer = []
-    
+    reset_capture(duration)
+
     # Start recording with callback
+    # 100ms blocks: same samples, ~10x fewer Python callback crossings
     with sd.InputStream(
         samplerate=SAMPLE_RATE,
+        blocksize=1600,
+        latency='low',
         channels=1,
         callback=audio_callback,
-        dtype='float32'
+        dtype='int16',
+        device=best_input_device()
     ):
-        # Show countdown
-        for i in range(duration, 0, -1):
-            print(f"\n   ⏱️  {i} seconds remaining...", end='', flush=True)
-            time.sleep(1)
-    
+        # Poll so the VAD in the callback can end the recording as soon
+        # as the speaker goes quiet instead of waiting out the window
+        deadline = time.time() + duration
+        last_shown = None
+        while not stop_requested:
+            remaining = int(deadline - time.time() + 0.999)
+            if remaining <= 0:
+                break
+            if remaining != last_shown:
+                print(f"\n   ⏱️  {remaining} seconds remaining...", end='', flush=True)
+                last_shown = remaining
+            time.sleep(0.05)
+
     is_recording = False
+
+    if stop_requested:
+        print("\n   ✓ Silence detected - stopped early", end='', flush=True)
     
     print("\n\n   ✓ Recording complete!")
     
-    # Combine audio chunks
-    if audio_buffer:
-        audio = np.concatenate(audio_buffer, axis=0)
-        
+    # Slice out what the callback wrote - no concatenate, no copy
+    audio = captured_audio()
+    if audio is not None:
         # Show statistics
-        max_volume = np.max(np.abs(audio))
-        avg_volume = np.mean(np.abs(audio))
+        max_volume = np.max(np.abs(audio)) / 32768.0
+        avg_volume = np.mean(np.abs(audio)) / 32768.0
         
         print(f"\n   📊 Audio Statistics:")
         print(f"      Max volume: {max_volume:.3f}")
@@ -104,9 +210,24 @@ def record_with_visualization(duration=5):
         print("   ❌ No audio captured!")
         return None
 
+def trim_silence(audio, threshold=0.01, pad_seconds=0.1):
+    """Clip leading/trailing silence so Whisper only sees speech"""
+    if audio.dtype.kind == 'i':
+        # int16 capture: scale the normalized threshold to sample units
+        threshold = int(threshold * 32768)
+    mask = np.abs(audio[:, 0]) > threshold
+    if not mask.any():
+        return audio
+    start = int(mask.argmax())
+    end = len(mask) - int(mask[::-1].argmax())
+    pad = int(pad_seconds * SAMPLE_RATE)
+    return audio[max(0, start - pad):min(len(audio), end + pad)]
+
 def save_audio(audio, filename="temp_audio.wav"):
     """Save audio to file"""
-    sf.write(filename, audio, SAMPLE_RATE)
+    # Trim dead air first - Whisper latency scales with clip length
+    audio = trim_silence(audio)
+    sf.write(filename, audio, SAMPLE_RATE, subtype='PCM_16')
     print(f"\n   💾 Saved to {filename}")
     return filename
 
@@ -115,10 +236,13 @@ def transcribe_audio_file(filename):
     print(f"\n📤 Sending to Whisper API...")
     
     try:
-        response = requests.post(
-            f"{API_URL}/stt/file",
-            json={"file_path": filename}
-        )
+        # Multipart upload: raw WAV bytes, no base64 inflation and no
+        # shared-filesystem assumption between recorder and server
+        with open(filename, "rb") as f:
+            response = SESSION.post(
+                f"{API_URL}/stt/upload",
+                files={"audio": (os.path.basename(filename), f, "audio/wav")}
+            )
         
         if response.status_code == 200:
             result = response.json()
@@ -135,7 +259,7 @@ def execute_command(text):
     print(f"\n⚡ Executing: '{text}'")
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{API_URL}/intent/route",
             json={"text": text}
         )
@@ -171,23 +295,25 @@ def test_microphone():
     print("   Watch the bars to see if your voice is detected!\n")
     
     try:
-        global audio_buffer
-        audio_buffer = []
-        
+        reset_capture(3)
+
         with sd.InputStream(
             samplerate=SAMPLE_RATE,
+            blocksize=1600,
+            latency='low',
             channels=1,
             callback=audio_callback,
-            dtype='float32'
+            dtype='int16',
+            device=best_input_device()
         ):
             time.sleep(3)
         
         print("\n\n   ✓ Microphone test complete!")
         
-        if audio_buffer:
-            audio = np.concatenate(audio_buffer, axis=0)
-            max_volume = np.max(np.abs(audio))
-            
+        audio = captured_audio()
+        if audio is not None:
+            max_volume = np.max(np.abs(audio)) / 32768.0
+
             if max_volume < 0.001:
                 print("   ❌ No sound detected!")
                 print("      Check:")
@@ -226,7 +352,7 @@ def main():
     
     # Check server
     try:
-        response = requests.get(f"{API_URL}/")
+        response = SESSION.get(f"{API_URL}/")
         if response.status_code != 200:
             print("\n❌ Server not running!")
             print("   Start with: python backend/main.py")
@@ -283,10 +409,16 @@ def main():
         
         # Save audio
         filename = save_audio(audio)
-        
-        # Transcribe
+
+        # Kick off the upload in the background so the Whisper round trip
+        # overlaps with the console output below
+        upload = None
         if api_key and api_key != "your_api_key_here":
-            text = transcribe_audio_file(filename)
+            upload = EXECUTOR.submit(transcribe_audio_file, filename)
+
+        # Transcribe
+        if upload is not None:
+            text = upload.result()
         else:
             print("\n📝 Mock mode - type your command:")
             text = input("   > ").strip()
@@ -306,8 +438,8 @@ def main():
         execute_command(text)
         
         # Clean up
-        if os.path.exists(filename):
-            os.remove(filename)
+        # One unlink syscall, no exists() race
+        Path(filename).unlink(missing_ok=True)
 
 if __name__ == "__main__":
     try:
@@ -3,17 +3,22 @@ import json
 
 BASE_URL = "http://localhost:8000"
 
+# One keep-alive session: every test reuses the same pooled TCP
+# connection instead of reconnecting per request
+SESSION = requests.Session()
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
 print("Testing EchoDebug API Endpoints\n" + "="*50)
 
 # Test 1: Root endpoint
 print("\n1. Testing root endpoint...")
-response = requests.get(f"{BASE_URL}/")
+response = SESSION.get(f"{BASE_URL}/")
 print(f"Status: {response.status_code}")
 print(f"Response: {response.json()}")
 
 # Test 2: Intent parsing
 print("\n2. Testing intent parsing...")
-response = requests.post(f"{BASE_URL}/intent", json={
+response = SESSION.post(f"{BASE_URL}/intent", json={
     "text": "find all syntax errors in main.py"
 })
 print(f"Status: {response.status_code}")
@@ -21,7 +26,7 @@ print(f"Response: {json.dumps(response.json(), indent=2)}")
 
 # Test 3: Code search
 print("\n3. Testing code search...")
-response = requests.post(f"{BASE_URL}/search", json={
+response = SESSION.post(f"{BASE_URL}/search", json={
     "query": "FastAPI",
     "lang": "python"
 })
@@ -33,7 +38,7 @@ if results:
 
 # Test 4: Symbol search
 print("\n4. Testing symbol search...")
-response = requests.post(f"{BASE_URL}/symbols", json={
+response = SESSION.post(f"{BASE_URL}/symbols", json={
     "name": "parse_intent",
     "lang": "python"
 })
@@ -45,7 +50,7 @@ if symbols:
 
 # Test 5: Run command
 print("\n5. Testing command execution...")
-response = requests.post(f"{BASE_URL}/run", json={
+response = SESSION.post(f"{BASE_URL}/run", json={
     "cmd": "python --version"
 })
 print(f"Status: {response.status_code}")
@@ -55,7 +60,7 @@ print(f"Output: {result['stdout'].strip()}")
 
 # Test 6: Explain trace
 print("\n6. Testing stack trace explanation...")
-response = requests.post(f"{BASE_URL}/explain-trace", json={
+response = SESSION.post(f"{BASE_URL}/explain-trace", json={
     "trace": 'File "test.py", line 42\nZeroDivisionError: division by zero'
 })
 print(f"Status: {response.status_code}")
@@ -63,7 +68,7 @@ print(f"Response: {json.dumps(response.json(), indent=2)}")
 
 # Test 7: Propose fix (placeholder)
 print("\n7. Testing propose fix...")
-response = requests.post(f"{BASE_URL}/propose-fix", json={
+response = SESSION.post(f"{BASE_URL}/propose-fix", json={
     "file": "test.py",
     "goal": "fix indentation"
 })
@@ -3,70 +3,80 @@ Complete End-to-End Test for EchoDebug
 Tests all implemented features
 """
 
+import atexit
+import os
+import shutil
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+
+from echo_test_common import ensure_server, make_session
 
 BASE_URL = "http://localhost:8000"
 
+# Banner row built once for every section header
+BANNER = "=" * 60
+
+# One keep-alive session: every test reuses the same pooled TCP
+# connection instead of reconnecting per request
+SESSION = make_session(pool_maxsize=6)
+
+# Fixture files are written once per run and swept up at process exit,
+# instead of each test paying its own write+unlink cycle
+FIXTURE_DIR = ".fixtures"
+FIXTURES = {
+    "lint.py": "\ndef broken_function()\n    x = 1\n    return x + y\n",
+    "fix.py": '\ndef hello()\n    print("Hello")\n',
+}
+
+def fixture_path(name):
+    """Write the named fixture on first use and return its path"""
+    path = os.path.join(FIXTURE_DIR, name)
+    if not os.path.exists(path):
+        os.makedirs(FIXTURE_DIR, exist_ok=True)
+        with open(path, "w") as f:
+            f.write(FIXTURES[name])
+    return path
+
+atexit.register(shutil.rmtree, FIXTURE_DIR, ignore_errors=True)
+
 def test_linting():
     """Test error detection"""
     print("\n🔍 Testing Linting & Error Detection...")
-    
-    # Create a test file with errors
-    with open("test_lint.py", "w") as f:
-        f.write("""
-def broken_function()
-    x = 1
-    return x + y
-""")
-    
-    response = requests.post(f"{BASE_URL}/lint", json={
-        "file": "test_lint.py",
+
+    response = SESSION.post(f"{BASE_URL}/lint", json={
+        "file": fixture_path("lint.py"),
         "lang": "python"
     })
-    
+
     if response.status_code == 200:
         result = response.json()
         print(f"   ✓ Found {result['total_errors']} error(s)")
         if result['errors']:
             print(f"   First error: Line {result['errors'][0]['line']}: {result['errors'][0]['message']}")
-    
-    # Clean up
-    import os
-    os.remove("test_lint.py")
 
 def test_fix_generation():
     """Test AI fix generation"""
     print("\n🔧 Testing Fix Generation...")
     
-    # Create a file with a fixable error
-    with open("test_fix.py", "w") as f:
-        f.write("""
-def hello()
-    print("Hello")
-""")
-    
-    response = requests.post(f"{BASE_URL}/propose-fix", json={
-        "file": "test_fix.py",
+    response = SESSION.post(f"{BASE_URL}/propose-fix", json={
+        "file": fixture_path("fix.py"),
         "goal": "fix syntax error"
     })
-    
+
     if response.status_code == 200:
         result = response.json()
         print(f"   ✓ Fix generated")
         print(f"   Rationale: {result.get('rationale', 'N/A')[:60]}...")
         print(f"   Risk level: {result.get('risk_level', 'unknown')}")
-    
-    # Clean up
-    import os
-    os.remove("test_fix.py")
 
 def test_full_pipeline():
     """Test complete intent → action pipeline"""
     print("\n🎯 Testing Full Pipeline...")
     
     # Test: Find errors intent → Linting
-    response = requests.post(f"{BASE_URL}/intent/route", json={
+    response = SESSION.post(f"{BASE_URL}/intent/route", json={
         "text": "find errors in main.py"
     })
     
@@ -88,30 +98,41 @@ def test_all_endpoints():
         ("POST", "/run", {"cmd": "echo test"}),
     ]
     
-    for method, endpoint, data in endpoints:
-        try:
-            if method == "GET":
-                response = requests.get(f"{BASE_URL}{endpoint}")
-            else:
-                response = requests.post(f"{BASE_URL}{endpoint}", json=data)
-            
-            status = "✓" if response.status_code == 200 else "✗"
-            print(f"   {status} {method} {endpoint}: {response.status_code}")
-        except Exception as e:
-            print(f"   ✗ {method} {endpoint}: {str(e)}")
+    # Bind method, URL and payload into each call up front; the workers
+    # then just invoke them, with no per-call URL build or GET/POST branch
+    calls = [
+        (method, endpoint,
+         partial(SESSION.request, method, f"{BASE_URL}{endpoint}", json=data))
+        for method, endpoint, data in endpoints
+    ]
+
+    # The endpoints are independent, so ping them all at once: wall time
+    # is the slowest response instead of the sum of all six
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        futures = {
+            executor.submit(call): (method, endpoint)
+            for method, endpoint, call in calls
+        }
+        for future in as_completed(futures):
+            method, endpoint = futures[future]
+            try:
+                code = future.result().status_code
+                status = "✓" if code == 200 else "✗"
+                print(f"   {status} {method} {endpoint}: {code}")
+            except Exception as e:
+                print(f"   ✗ {method} {endpoint}: {str(e)}")
 
 def main():
-    print("\n" + "="*60)
+    print("\n" + BANNER)
     print("  🎙️  EchoDebug Complete Test Suite")
-    print("="*60)
+    print(BANNER)
     
     try:
-        # Check server
-        response = requests.get(f"{BASE_URL}/")
-        if response.status_code != 200:
+        # Check server (bounded 2 s probe - fails fast on a dead server)
+        if not ensure_server(SESSION):
             print("\n❌ Server not running!")
             return
-        
+
         print("\n✓ Server is running")
         
         # Run tests
@@ -120,9 +141,9 @@ def main():
         test_fix_generation()
         test_full_pipeline()
         
-        print("\n" + "="*60)
+        print("\n" + BANNER)
         print("  ✅ All Tests Passed!")
-        print("="*60)
+        print(BANNER)
         
         print("\n📊 EchoDebug Status:")
         print("   ✓ Intent parsing (keyword-based)")